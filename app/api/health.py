@@ -1,13 +1,16 @@
 """Health check endpoints."""
 
 import asyncio
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db, check_db_connection
+from app.config import settings
+from app.database import get_db, check_db_connection, get_pool_status
 from app.services.vector_service import VectorService
-from app.services.llm_service import LLMService
+from app.services.llm_service import get_shared_llm_service
 from app.core.exceptions import VectorStoreError, LLMError
 from app.core.logging import get_logger
 
@@ -15,24 +18,70 @@ logger = get_logger(__name__)
 
 router = APIRouter()
 
+# Last healthy readiness result as (monotonic timestamp, payload)
+_readiness_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+_readiness_lock = asyncio.Lock()
+
 
 @router.get("/healthz")
 async def health_check():
     """Basic health check endpoint."""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "version": "1.0.0"
     }
 
 
 @router.get("/readyz")
 async def readiness_check(db: AsyncSession = Depends(get_db)):
-    """Comprehensive readiness check."""
-    start_time = datetime.utcnow()
+    """
+    Comprehensive readiness check.
+    
+    Healthy results are reused for settings.health_cache_ttl seconds so
+    probe bursts do not each hit the database and LLM provider.
+    """
+    global _readiness_cache
+    
+    cached = _get_cached_readiness()
+    if cached is not None:
+        return cached
+    
+    async with _readiness_lock:
+        # Another probe may have refreshed the result while we waited
+        cached = _get_cached_readiness()
+        if cached is not None:
+            return cached
+        
+        health_status = await _run_readiness_checks(db)
+        
+        # Return appropriate status code
+        if health_status["status"] == "unhealthy":
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=health_status
+            )
+        
+        _readiness_cache = (time.monotonic(), health_status)
+        return health_status
+
+
+def _get_cached_readiness() -> Optional[Dict[str, Any]]:
+    """Return the last healthy readiness result if it is still fresh."""
+    if _readiness_cache is None:
+        return None
+    checked_at, health_status = _readiness_cache
+    if time.monotonic() - checked_at >= settings.health_cache_ttl:
+        return None
+    return health_status
+
+
+async def _run_readiness_checks(db: AsyncSession) -> Dict[str, Any]:
+    """Run the database, vector store and LLM readiness checks."""
+    start_time = time.perf_counter()
     health_status = {
         "status": "healthy",
-        "timestamp": start_time.isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "checks": {}
     }
     
@@ -68,7 +117,7 @@ async def readiness_check(db: AsyncSession = Depends(get_db)):
     
     # Check LLM service
     try:
-        llm_service = LLMService()
+        llm_service = get_shared_llm_service()
         # Simple test to verify LLM is accessible
         test_result = await llm_service.generate_embedding("test")
         health_status["checks"]["llm_service"] = {
@@ -83,16 +132,9 @@ async def readiness_check(db: AsyncSession = Depends(get_db)):
         health_status["status"] = "unhealthy"
     
     # Calculate response time
-    response_time = (datetime.utcnow() - start_time).total_seconds()
+    response_time = time.perf_counter() - start_time
     health_status["response_time_seconds"] = response_time
     
-    # Return appropriate status code
-    if health_status["status"] == "unhealthy":
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=health_status
-        )
-    
     return health_status
 
 
@@ -106,9 +148,10 @@ async def get_metrics(db: AsyncSession = Depends(get_db)):
         
         # System metrics
         metrics = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "database": {
                 "status": "connected",
+                "pool": get_pool_status(),
                 "vector_stats": vector_stats
             },
             "api": {
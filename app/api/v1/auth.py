@@ -1,6 +1,7 @@
 """Authentication endpoints."""
 
 from datetime import timedelta
+from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,6 +19,19 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/auth")
 
+# Fields of the User response schema, read straight off the ORM user
+_USER_FIELDS = tuple(User.model_fields)
+
+
+def _user_response(user: Any) -> User:
+    """
+    Build the User response without re-validating database values.
+    
+    FastAPI passes model instances through as-is, so this skips the
+    validator chain (EmailStr parsing included) for data already stored.
+    """
+    return User.model_construct(**{field: getattr(user, field) for field in _USER_FIELDS})
+
 
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
 async def register(
@@ -30,7 +44,7 @@ async def register(
         user = await auth_service.create_user(user_data)
         
         logger.info("User registered", user_id=user.id, username=user.username)
-        return user
+        return _user_response(user)
         
     except ConflictError as e:
         raise HTTPException(
@@ -129,7 +143,7 @@ async def get_current_user_info(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get current user information."""
-    return current_user
+    return _user_response(current_user)
 
 
 @router.post("/logout")
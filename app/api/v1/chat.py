@@ -1,11 +1,12 @@
 """Chat endpoints for messaging functionality."""
 
+from contextlib import aclosing
 from typing import AsyncGenerator
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
 import asyncio
+import orjson
 
 from app.database import get_db
 from app.models.user import User
@@ -20,6 +21,13 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/chat")
 
+_SSE_DONE = b"data: [DONE]\n\n"
+
+
+def _sse_event(payload: bytes) -> bytes:
+    """Frame a JSON payload as a server-sent event."""
+    return b"data: " + payload + b"\n\n"
+
 
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
@@ -90,15 +98,30 @@ async def stream_message(
         chat_request.stream = True
         
         async def generate_stream():
-            """Generate streaming response."""
+            """
+            Generate streaming response as pre-encoded SSE frames.
+            
+            If the client disconnects, the cancellation closes the chat
+            stream right away (not at garbage collection), which closes the
+            upstream OpenAI stream and stops generation.
+            """
             try:
-                async for chunk in chat_service.stream_message(chat_request, current_user):
-                    # Convert to JSON and add newline for SSE format
-                    chunk_data = chunk.model_dump()
-                    yield f"data: {json.dumps(chunk_data)}\n\n"
+                # Every delta chunk shares the fields after "delta", so they
+                # are encoded once and only the delta is serialized per token
+                delta_tail = None
+                async with aclosing(chat_service.stream_message(chat_request, current_user)) as stream:
+                    async for chunk in stream:
+                        if chunk.finished:
+                            yield _sse_event(orjson.dumps(chunk.model_dump()))
+                            continue
+                        if delta_tail is None:
+                            delta_tail = b"," + orjson.dumps(
+                                chunk.model_dump(exclude={"delta"})
+                            )[1:]
+                        yield b'data: {"delta":' + orjson.dumps(chunk.delta) + delta_tail + b"\n\n"
                 
                 # Send final completion marker
-                yield "data: [DONE]\n\n"
+                yield _SSE_DONE
                 
             except Exception as e:
                 # Send error in stream
@@ -107,16 +130,17 @@ async def stream_message(
                     finished=True,
                     metadata={"error": str(e)}
                 )
-                yield f"data: {json.dumps(error_chunk.model_dump())}\n\n"
+                yield _sse_event(orjson.dumps(error_chunk.model_dump()))
                 logger.error("Streaming failed", error=str(e), user_id=current_user.id)
         
         return StreamingResponse(
             generate_stream(),
-            media_type="text/plain",
+            media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Content-Type": "text/event-stream",
+                # Keep proxies and GZipMiddleware from buffering the stream
+                "X-Accel-Buffering": "no",
+                "Content-Encoding": "identity",
             }
         )
         
@@ -2,9 +2,7 @@
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
 from app.models.user import User
 from app.services.chat_service import ChatService
 from app.schemas.conversation import (
@@ -12,7 +10,7 @@ from app.schemas.conversation import (
     ConversationWithMessages, ConversationSummary
 )
 from app.dependencies import get_current_active_user, get_chat_service
-from app.core.exceptions import NotFoundError
+from app.core.exceptions import NotFoundError, ValidationError
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -52,27 +50,12 @@ async def get_conversations(
 ):
     """Get user conversations."""
     try:
-        conversations = await chat_service.get_user_conversations(
+        return await chat_service.get_conversation_summaries(
             user=current_user,
             limit=limit,
             offset=offset,
             include_inactive=include_inactive
         )
-        
-        # Convert to summary format
-        summaries = []
-        for conv in conversations:
-            summaries.append(ConversationSummary(
-                id=conv.id,
-                title=conv.title,
-                message_count=conv.message_count,
-                total_tokens=conv.total_tokens,
-                last_message_at=conv.last_message_at,
-                created_at=conv.created_at,
-                is_active=conv.is_active
-            ))
-        
-        return summaries
     except Exception as e:
         logger.error("Conversation retrieval failed", error=str(e))
         raise HTTPException(
@@ -107,19 +90,40 @@ async def update_conversation(
     conversation_id: int,
     update_data: ConversationUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    chat_service: ChatService = Depends(get_chat_service)
 ):
     """Update conversation."""
-    # Implementation would update conversation metadata
-    pass
+    try:
+        conversation = await chat_service.update_conversation(
+            conversation_id=conversation_id,
+            user=current_user,
+            update_data=update_data
+        )
+        return conversation
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except NotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Conversation {conversation_id} not found"
+        )
 
 
 @router.delete("/{conversation_id}")
 async def delete_conversation(
     conversation_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    chat_service: ChatService = Depends(get_chat_service)
 ):
     """Delete conversation (soft delete)."""
-    # Implementation would soft delete conversation
-    pass
\ No newline at end of file
+    try:
+        await chat_service.delete_conversation(
+            conversation_id=conversation_id,
+            user=current_user
+        )
+        return {"message": "Conversation deleted successfully"}
+    except NotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Conversation {conversation_id} not found"
+        )
\ No newline at end of file
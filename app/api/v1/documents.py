@@ -1,7 +1,7 @@
 """Document management endpoints."""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -16,6 +16,24 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/documents")
 
+# (response field, ORM attribute) pairs; the metadata column is mapped as meta
+_DOCUMENT_FIELDS = tuple(
+    (field, "meta" if field == "metadata" else field)
+    for field in Document.model_fields
+)
+
+
+def _document_response(document: Any) -> Document:
+    """
+    Build the Document response without re-validating database values.
+    
+    Rows read from our own database are already well-typed, so listing
+    pages skips per-field validation for every document.
+    """
+    return Document.model_construct(
+        **{field: getattr(document, attr) for field, attr in _DOCUMENT_FIELDS}
+    )
+
 
 @router.post("/upload", response_model=Document, status_code=status.HTTP_201_CREATED)
 async def upload_document(
@@ -27,9 +45,6 @@ async def upload_document(
 ):
     """Upload a document for knowledge base."""
     try:
-        # Read file content
-        file_content = await file.read()
-        
         # Create upload data
         upload_data = DocumentUpload(
             filename=file.filename or "unnamed_file",
@@ -38,10 +53,10 @@ async def upload_document(
             is_public=is_public
         )
         
-        # Process upload
+        # Process upload; the spooled file is read in chunks by the service
         document = await document_service.upload_document(
             user=current_user,
-            file_content=file_content,
+            file=file,
             upload_data=upload_data
         )
         
@@ -52,7 +67,7 @@ async def upload_document(
             filename=document.filename
         )
         
-        return document
+        return _document_response(document)
         
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -66,15 +81,22 @@ async def upload_document(
 
 @router.get("/", response_model=List[Document])
 async def get_documents(
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
     file_types: str = Query("", description="Comma-separated file types"),
     tags: str = Query("", description="Comma-separated tags"),
     include_public: bool = Query(True),
     current_user: User = Depends(get_current_active_user),
     document_service: DocumentService = Depends(get_document_service)
 ):
-    """Get user documents."""
+    """
+    Get user documents.
+    
+    Full pages set an X-Next-Cursor header; passing it back as cursor
+    fetches the next page without the cost of a deep OFFSET.
+    """
     try:
         file_type_list = file_types.split(",") if file_types else None
         tag_list = tags.split(",") if tags else None
@@ -85,11 +107,17 @@ async def get_documents(
             offset=offset,
             file_types=file_type_list,
             tags=tag_list,
-            include_public=include_public
+            include_public=include_public,
+            cursor=cursor
         )
         
-        return documents
+        if len(documents) == limit:
+            response.headers["X-Next-Cursor"] = document_service.encode_cursor(documents[-1])
         
+        return [_document_response(document) for document in documents]
+        
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error("Document retrieval failed", error=str(e))
         raise HTTPException(
@@ -134,7 +162,7 @@ async def get_document(
     """Get document by ID."""
     try:
         document = await document_service.get_document(document_id, current_user)
-        return document
+        return _document_response(document)
     except NotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,7 +184,7 @@ async def update_document(
             user=current_user,
             update_data=update_data
         )
-        return document
+        return _document_response(document)
     except NotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
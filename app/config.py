@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     # Environment
     debug: bool = Field(default=False, env="DEBUG")
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_request_start: bool = Field(default=False, env="LOG_REQUEST_START")
     
     # API Configuration
     api_v1_prefix: str = Field(default="/api/v1", env="API_V1_PREFIX")
@@ -32,6 +33,10 @@ class Settings(BaseSettings):
         env="DATABASE_URL"
     )
     database_echo: bool = Field(default=False, env="DATABASE_ECHO")
+    database_pool_size: int = Field(default=20, env="DATABASE_POOL_SIZE")
+    database_max_overflow: int = Field(default=10, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout: float = Field(default=30.0, env="DATABASE_POOL_TIMEOUT")
+    database_pool_recycle: int = Field(default=1800, env="DATABASE_POOL_RECYCLE")
     
     # Redis Configuration
     redis_url: Optional[str] = Field(default=None, env="REDIS_URL")
@@ -41,16 +46,25 @@ class Settings(BaseSettings):
     llm_model: str = Field(default="gpt-4", env="LLM_MODEL")
     llm_temperature: float = Field(default=0.7, env="LLM_TEMPERATURE")
     llm_max_tokens: int = Field(default=2048, env="LLM_MAX_TOKENS")
+    llm_max_concurrency: int = Field(default=8, env="LLM_MAX_CONCURRENCY")
+    llm_max_connections: int = Field(default=100, env="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: int = Field(default=50, env="LLM_MAX_KEEPALIVE_CONNECTIONS")
+    llm_keepalive_expiry: float = Field(default=60.0, env="LLM_KEEPALIVE_EXPIRY")
+    llm_requests_per_minute: int = Field(default=0, env="LLM_REQUESTS_PER_MINUTE")
+    llm_tokens_per_minute: int = Field(default=0, env="LLM_TOKENS_PER_MINUTE")
+    llm_response_cache_ttl: float = Field(default=3600.0, env="LLM_RESPONSE_CACHE_TTL")
     embedding_model: str = Field(default="text-embedding-3-small", env="EMBEDDING_MODEL")
     
     # Vector Store Configuration
     vector_store_type: str = Field(default="pgvector", env="VECTOR_STORE_TYPE")
     vector_dimension: int = Field(default=1536, env="VECTOR_DIMENSION")
+    retrieval_context_tokens: int = Field(default=2000, env="RETRIEVAL_CONTEXT_TOKENS")
     
     # Authentication
     secret_key: str = Field(env="SECRET_KEY")
     access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_days: int = Field(default=7, env="REFRESH_TOKEN_EXPIRE_DAYS")
+    password_hash_rounds: int = Field(default=12, env="PASSWORD_HASH_ROUNDS")
     
     # File Upload Configuration
     max_file_size_mb: int = Field(default=50, env="MAX_FILE_SIZE_MB")
@@ -59,6 +73,7 @@ class Settings(BaseSettings):
         env="ALLOWED_FILE_TYPES"
     )
     upload_dir: str = Field(default="./uploads", env="UPLOAD_DIR")
+    extract_workers: int = Field(default=2, env="EXTRACT_WORKERS")
     
     # Rate Limiting
     rate_limit_enabled: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
@@ -70,7 +85,9 @@ class Settings(BaseSettings):
     
     # Monitoring and Health Checks
     health_check_timeout: int = Field(default=30, env="HEALTH_CHECK_TIMEOUT")
+    health_cache_ttl: float = Field(default=2.0, env="HEALTH_CACHE_TTL")
     enable_metrics: bool = Field(default=True, env="ENABLE_METRICS")
+    stats_cache_ttl: int = Field(default=60, env="STATS_CACHE_TTL")
 
     @validator("cors_origins", pre=True)
     def assemble_cors_origins(cls, v):
@@ -3,27 +3,37 @@
 import logging
 import sys
 from typing import Any
+import orjson
 import structlog
 from structlog.stdlib import LoggerFactory
 
 from app.config import settings
 
 
+def _json_dumps(event_dict: Any, **kwargs: Any) -> str:
+    """Serialize a log event with orjson; stdlib handlers expect str."""
+    return orjson.dumps(
+        event_dict,
+        default=kwargs.get("default"),
+        option=orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
 def setup_logging() -> None:
     """Configure structured logging for the application."""
     
-    # Configure structlog
+    # Configure structlog. Log calls pass key-value pairs, never %-style
+    # arguments or bytes, so PositionalArgumentsFormatter and UnicodeDecoder
+    # are left out; the stack/exception processors only act when requested.
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer() if not settings.debug 
+            structlog.processors.JSONRenderer(serializer=_json_dumps) if not settings.debug 
             else structlog.dev.ConsoleRenderer(colors=True),
         ],
         context_class=dict,
@@ -1,19 +1,40 @@
 """Security utilities for authentication and authorization."""
 
-from datetime import datetime, timedelta
+import hashlib
+import time
+from datetime import timedelta
 from typing import Any, Union, Optional
+import bcrypt
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from passlib.hash import bcrypt
 
 from app.config import settings
 from app.core.exceptions import AuthenticationError
+from app.utils.cache import TTLCache
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. Verification calls bcrypt directly, skipping
+# passlib's per-call scheme identification; bcrypt is the only scheme. The
+# cost factor is stored in each hash, so changing the rounds only affects
+# newly hashed passwords.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.password_hash_rounds
+)
 
 # JWT settings
 ALGORITHM = "HS256"
+# jose verifies exp itself; make sure every accepted token carries one
+_DECODE_OPTIONS = {"require_exp": True, "require_sub": True}
+
+# Default token lifetimes in seconds
+_ACCESS_TOKEN_TTL = settings.access_token_expire_minutes * 60
+_REFRESH_TOKEN_TTL = settings.refresh_token_expire_days * 86400
+
+# Verified token claims as (exp, sub, type), keyed by the SHA-256 digest of the
+# token so raw tokens are never held in memory. Entries are also checked
+# against the token's own expiry, which may come before the cache TTL.
+_token_cache = TTLCache(maxsize=10_000, ttl=5.0)
 
 
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -27,10 +48,8 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
     Returns:
         Encoded JWT token
     """
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    ttl = _ACCESS_TOKEN_TTL if expires_delta is None else int(expires_delta.total_seconds())
+    expire = int(time.time()) + ttl
     
     to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
@@ -48,10 +67,8 @@ def create_refresh_token(subject: Union[str, Any], expires_delta: Optional[timed
     Returns:
         Encoded JWT refresh token
     """
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+    ttl = _REFRESH_TOKEN_TTL if expires_delta is None else int(expires_delta.total_seconds())
+    expire = int(time.time()) + ttl
     
     to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
@@ -72,20 +89,29 @@ def verify_token(token: str, token_type: str = "access") -> str:
     Raises:
         AuthenticationError: If token is invalid or expired
     """
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        token_type_claim: str = payload.get("type")
-        
-        if username is None:
-            raise AuthenticationError("Token missing subject")
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None and cached[0] > time.time():
+        _, username, token_type_claim = cached
+    else:
+        try:
+            payload = jwt.decode(
+                token, settings.secret_key, algorithms=[ALGORITHM], options=_DECODE_OPTIONS
+            )
+        except JWTError as e:
+            raise AuthenticationError(f"Invalid token: {str(e)}")
+        username = payload.get("sub")
+        token_type_claim = payload.get("type")
+        if username is not None:
+            _token_cache.set(cache_key, (payload["exp"], username, token_type_claim))
+    
+    if username is None:
+        raise AuthenticationError("Token missing subject")
+    
+    if token_type_claim != token_type:
+        raise AuthenticationError(f"Invalid token type. Expected {token_type}, got {token_type_claim}")
         
-        if token_type_claim != token_type:
-            raise AuthenticationError(f"Invalid token type. Expected {token_type}, got {token_type_claim}")
-            
-        return username
-    except JWTError as e:
-        raise AuthenticationError(f"Invalid token: {str(e)}")
+    return username
 
 
 def get_password_hash(password: str) -> str:
@@ -112,4 +138,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed hash, or a password bcrypt refuses to process
+        return False
\ No newline at end of file
@@ -1,19 +1,32 @@
 """Database configuration and connection management."""
 
 import asyncio
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import QueuePool
 from sqlalchemy import text
 
 from app.config import settings
 
+
+def _create_engine(**pool_options: Any) -> AsyncEngine:
+    """Create the SQLAlchemy engine with the given pool options."""
+    return create_async_engine(
+        str(settings.database_url),
+        echo=settings.database_echo,
+        **pool_options,
+    )
+
+
 # Create the SQLAlchemy engine
-engine = create_async_engine(
-    str(settings.database_url),
-    echo=settings.database_echo,
-    poolclass=NullPool,  # Use NullPool for development
+engine = _create_engine(
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    pool_recycle=settings.database_pool_recycle,
     pool_pre_ping=True,
 )
 
@@ -24,30 +37,103 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+
+def configure_engine(**pool_options: Any) -> None:
+    """
+    Replace the engine with one using different pool options.
+    
+    For processes that should not use the API's connection pool, such as
+    the one-shot management commands (poolclass=NullPool). Call it before
+    the first query; AsyncSessionLocal is rebound to the new engine.
+    
+    Args:
+        **pool_options: Pool keyword arguments for create_async_engine
+    """
+    global engine
+    engine = _create_engine(**pool_options)
+    AsyncSessionLocal.configure(bind=engine)
+
+
 # Create declarative base
 Base = declarative_base()
 
+# Connectivity probe, compiled once and reused by health checks
+_PING = text("SELECT 1")
+
+# Non-NULL once the schema has been created
+_SCHEMA_PROBE = text("SELECT to_regclass('users')")
+
+# Session of the current request, bound by get_db
+db_session_var: ContextVar[Optional[AsyncSession]] = ContextVar("db_session", default=None)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get database session.
     
+    FastAPI caches this dependency per request, so the auth dependencies
+    and the route share one session. The session is also bound to
+    db_session_var for code that is not wired through Depends.
+    
     Yields:
         AsyncSession: Database session
     """
     async with AsyncSessionLocal() as session:
+        token = db_session_var.set(session)
         try:
             yield session
         except Exception:
             await session.rollback()
             raise
         finally:
-            await session.close()
+            db_session_var.reset(token)
+
+
+@asynccontextmanager
+async def db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Open a database session outside of a request.
+    
+    For scripts and the management CLI, where get_db cannot be used as a
+    dependency. The session is rolled back on error and closed on exit.
+    
+    Yields:
+        AsyncSession: Database session
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def get_current_db_session() -> Optional[AsyncSession]:
+    """
+    Get the database session bound to the current request.
+    
+    Returns:
+        AsyncSession if called within a request using get_db, None otherwise
+    """
+    return db_session_var.get()
 
 
-async def init_db() -> None:
-    """Initialize database and install required extensions."""
+async def init_db(force: bool = False) -> None:
+    """
+    Initialize database and install required extensions.
+    
+    Args:
+        force: Run the full setup even if the schema already exists. By
+            default a single probe for the users table skips the extension
+            and per-table checks on an initialized database. No Alembic
+            revisions are shipped: the init-database command (which forces)
+            creates missing tables and their indexes, but changes to
+            existing tables or columns need manual DDL.
+    """
     async with engine.begin() as conn:
+        if not force and await conn.scalar(_SCHEMA_PROBE) is not None:
+            return
+        
         # Install pgvector extension
         try:
             await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
@@ -66,6 +152,26 @@ async def close_db() -> None:
     print("✓ Database connections closed")
 
 
+def get_pool_status() -> Dict[str, Any]:
+    """
+    Get connection pool occupancy.
+    
+    Returns:
+        Dictionary with pool size and checked-in/checked-out connection counts
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pooled": False}
+    return {
+        "pooled": True,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.database_max_overflow
+    }
+
+
 async def check_db_connection() -> bool:
     """
     Check if database connection is healthy.
@@ -74,8 +180,8 @@ async def check_db_connection() -> bool:
         bool: True if connection is healthy, False otherwise
     """
     try:
-        async with engine.begin() as conn:
-            await conn.execute(text("SELECT 1"))
+        async with engine.connect() as conn:
+            await conn.scalar(_PING)
         return True
     except Exception:
         return False
\ No newline at end of file
@@ -10,7 +10,7 @@ from app.core.security import verify_token
 from app.core.exceptions import AuthenticationError, NotFoundError
 from app.models.user import User
 from app.services.auth_service import AuthService
-from app.services.llm_service import LLMService
+from app.services.llm_service import LLMService, get_shared_llm_service
 from app.services.vector_service import VectorService
 from app.services.chat_service import ChatService
 from app.services.document_service import DocumentService
@@ -40,7 +40,7 @@ async def get_current_user(
     try:
         username = verify_token(credentials.credentials, token_type="access")
         auth_service = AuthService(db)
-        user = await auth_service.get_user_by_username(username)
+        user = await auth_service.get_cached_user_by_username(username)
         if not user:
             raise NotFoundError(f"User {username} not found")
         if not user.is_active:
@@ -107,7 +107,7 @@ def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
 
 def get_llm_service() -> LLMService:
     """Get LLM service instance."""
-    return LLMService()
+    return get_shared_llm_service()
 
 
 def get_vector_service(db: AsyncSession = Depends(get_db)) -> VectorService:
@@ -158,7 +158,7 @@ async def get_optional_current_user(
     try:
         username = verify_token(credentials.credentials, token_type="access")
         auth_service = AuthService(db)
-        user = await auth_service.get_user_by_username(username)
+        user = await auth_service.get_cached_user_by_username(username)
         if user and user.is_active:
             return user
     except (AuthenticationError, NotFoundError):
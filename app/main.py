@@ -1,14 +1,18 @@
 """Main FastAPI application."""
 
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.openapi.utils import get_openapi
 import structlog
 
 from app.config import settings
 from app.database import init_db, close_db
+from app.services.llm_service import close_http_clients, load_tokenizer
+from app.utils.document_processor import shutdown_extract_pool, start_extract_pool
 from app.core.logging import setup_logging
 from app.core.exceptions import ChatAPIException
 from app.api.v1 import auth, chat, conversations, messages, documents, profiles, prompts, analytics
@@ -33,10 +37,15 @@ async def lifespan(app: FastAPI):
         logger.error("Database initialization failed", error=str(e))
         raise
     
+    await load_tokenizer()
+    start_extract_pool()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Chat API application")
+    await close_http_clients()
+    shutdown_extract_pool()
     await close_db()
 
 
@@ -46,6 +55,7 @@ app = FastAPI(
     description=settings.api_description,
     version=settings.api_version,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
 )
@@ -59,21 +69,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads such as conversation and document lists
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # Exception handlers
 @app.exception_handler(ChatAPIException)
 async def chat_api_exception_handler(request: Request, exc: ChatAPIException):
     """Handle custom Chat API exceptions."""
-    logger.error(
-        "API Exception",
-        status_code=exc.status_code,
-        message=exc.message,
-        details=exc.details,
-        path=request.url.path,
-        method=request.method
-    )
+    # Client errors (auth failures, not found, validation) are routine and
+    # already show up in the request log with their status code
+    if exc.status_code >= 500:
+        logger.error(
+            "API Exception",
+            status_code=exc.status_code,
+            message=exc.message,
+            details=exc.details,
+            path=request.url.path,
+            method=request.method
+        )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": {
@@ -96,7 +112,7 @@ async def general_exception_handler(request: Request, exc: Exception):
         method=request.method
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": {
@@ -112,21 +128,25 @@ async def general_exception_handler(request: Request, exc: Exception):
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log HTTP requests and responses."""
-    start_time = structlog.get_logger().info(
-        "Request started",
-        method=request.method,
-        url=str(request.url),
-        user_agent=request.headers.get("user-agent"),
-    )
+    start_time = time.perf_counter()
+    # Log the path only: rendering the full URL is costly and the query
+    # string may carry values that do not belong in logs
+    request_logger = logger.bind(method=request.method, path=request.url.path)
+    
+    # The completion record carries everything but the user agent, so the
+    # start record is opt-in
+    if settings.log_request_start:
+        request_logger.info(
+            "Request started",
+            user_agent=request.headers.get("user-agent"),
+        )
     
     response = await call_next(request)
     
-    structlog.get_logger().info(
+    request_logger.info(
         "Request completed",
-        method=request.method,
-        url=str(request.url),
         status_code=response.status_code,
-        duration_ms=int((structlog.get_logger()._context.get("time", 0)) * 1000)
+        duration_ms=int((time.perf_counter() - start_time) * 1000)
     )
     
     return response
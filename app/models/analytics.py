@@ -5,6 +5,7 @@ from typing import Optional
 from sqlalchemy import String, Integer, DateTime, Date, Text, Float
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.database import Base
 
@@ -40,7 +41,7 @@ class Analytics(Base):
     estimated_cost: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # USD
     
     # Additional metadata
-    metadata: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, nullable=True)
     
     # Error tracking
     error_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
@@ -1,10 +1,11 @@
 """Conversation model for chat sessions."""
 
 from datetime import datetime
-from typing import List, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from sqlalchemy import String, Integer, ForeignKey, DateTime, Text, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.database import Base
 
@@ -25,7 +26,7 @@ class Conversation(Base):
     # Conversation metadata
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     summary: Mapped[str] = mapped_column(Text, nullable=True)
-    context_settings: Mapped[str] = mapped_column(Text, nullable=True)  # JSON string for LLM settings
+    context_settings: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)  # LLM settings
     
     # Statistics
     message_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -51,7 +52,7 @@ class Conversation(Base):
         "Message", 
         back_populates="conversation",
         cascade="all, delete-orphan",
-        order_by="Message.created_at"
+        order_by="[Message.created_at, Message.id]"
     )
 
     def __repr__(self) -> str:
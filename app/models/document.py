@@ -2,10 +2,11 @@
 
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Text, Boolean, LargeBinary
+from sqlalchemy import Enum, Index, String, Integer, ForeignKey, DateTime, Text, Boolean, LargeBinary, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import JSONB
+from pgvector.sqlalchemy import HALFVEC
 
 from app.database import Base
 
@@ -17,6 +18,23 @@ class Document(Base):
     """Document model for knowledge base documents."""
     
     __tablename__ = "documents"
+    __table_args__ = (
+        # Serves per-user listings ordered newest first without a sort, and
+        # keyset pagination on (created_at, id)
+        Index(
+            "ix_documents_user_created",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC")
+        ),
+        # Approximate nearest-neighbour index for ORDER BY embedding <=> :query
+        Index(
+            "ix_documents_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "halfvec_cosine_ops"}
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
@@ -33,12 +51,17 @@ class Document(Base):
     content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)  # SHA-256 hash
     
     # Processing status
-    processing_status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
-    # 'pending', 'processing', 'completed', 'failed'
+    processing_status: Mapped[str] = mapped_column(
+        Enum("pending", "processing", "completed", "failed", name="document_processing_status"),
+        default="pending",
+        nullable=False
+    )
     processing_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
-    # Vector embedding for semantic search
-    embedding: Mapped[Optional[Vector]] = mapped_column(Vector(1536), nullable=True)
+    # Vector embedding for semantic search, stored as float16 (halfvec) to
+    # halve row size; the cosine error is well below embedding noise
+    embedding: Mapped[Optional[HALFVEC]] = mapped_column(HALFVEC(1536), nullable=True)
+    embedding_model: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # Model that produced it
     
     # Document chunks for RAG
     chunk_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -52,7 +75,7 @@ class Document(Base):
     parent_document_id: Mapped[Optional[int]] = mapped_column(ForeignKey("documents.id"), nullable=True)
     
     # Metadata
-    metadata: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, nullable=True)
     tags: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # Comma-separated tags
     
     # Status flags
@@ -2,9 +2,11 @@
 
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Text, Boolean, Float
+from sqlalchemy import Enum, Index, String, Integer, ForeignKey, DateTime, Text, Boolean, Float
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB
+from pgvector.sqlalchemy import HALFVEC
 
 from app.database import Base
 
@@ -16,17 +18,30 @@ class Message(Base):
     """Message model for chat messages."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # Approximate nearest-neighbour index for ORDER BY embedding <=> :query
+        Index(
+            "ix_messages_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "halfvec_cosine_ops"}
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     conversation_id: Mapped[int] = mapped_column(ForeignKey("conversations.id"), nullable=False, index=True)
     
     # Message content
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    role: Mapped[str] = mapped_column(String(20), nullable=False)  # 'user', 'assistant', 'system'
+    role: Mapped[str] = mapped_column(
+        Enum("user", "assistant", "system", name="message_role"),
+        nullable=False
+    )
     message_type: Mapped[str] = mapped_column(String(20), default="text", nullable=False)  # 'text', 'image', 'file'
     
-    # Metadata
-    metadata: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string for additional data
+    # Metadata; "metadata" is reserved on declarative classes, so the
+    # attribute is named meta and mapped onto the metadata column
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, nullable=True)
     is_edited: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     
@@ -35,8 +50,9 @@ class Message(Base):
     processing_time: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # seconds
     model_used: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     
-    # Vector embeddings for semantic search
-    embedding: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Stored as JSON array
+    # Vector embeddings for semantic search, stored as float16 (halfvec) to
+    # halve row size; the cosine error is well below embedding noise
+    embedding: Mapped[Optional[HALFVEC]] = mapped_column(HALFVEC(1536), nullable=True)
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
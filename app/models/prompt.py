@@ -5,6 +5,7 @@ from typing import Optional
 from sqlalchemy import String, Integer, DateTime, Text, Boolean
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.database import Base
 
@@ -46,7 +47,7 @@ class Prompt(Base):
     
     # Tags and metadata
     tags: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # Comma-separated tags
-    metadata: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, nullable=True)
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
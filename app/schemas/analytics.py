@@ -2,7 +2,7 @@
 
 from datetime import datetime, date
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 
 
 class AnalyticsBase(BaseModel):
@@ -37,7 +37,7 @@ class Analytics(AnalyticsBase):
     token_count: Optional[int] = None
     tokens_per_second: Optional[float] = None
     estimated_cost: Optional[float] = None
-    metadata: Optional[str] = None  # JSON string in DB
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta", "metadata"), description="Additional metadata")
     error_type: Optional[str] = None
     error_message: Optional[str] = None
     created_at: datetime
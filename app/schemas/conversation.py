@@ -48,10 +48,13 @@ class ConversationWithMessages(Conversation):
 
 class ConversationSummary(BaseModel):
     """Schema for conversation summary in lists."""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     title: str
     message_count: int
     total_tokens: int
     last_message_at: Optional[datetime] = None
     created_at: datetime
-    is_active: bool
\ No newline at end of file
+    is_active: bool
+    last_message_preview: Optional[str] = Field(None, description="Start of the most recent message")
\ No newline at end of file
@@ -2,14 +2,15 @@
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 
 
 class DocumentBase(BaseModel):
     """Base document schema with common fields."""
     filename: str = Field(..., description="Document filename")
     tags: Optional[str] = Field(None, description="Comma-separated tags")
-    metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+    # ORM objects expose the column as meta
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta", "metadata"), description="Additional metadata")
     is_public: bool = Field(default=False, description="Public visibility")
 
 
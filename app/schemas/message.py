@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 
 
 class MessageBase(BaseModel):
@@ -10,7 +10,8 @@ class MessageBase(BaseModel):
     content: str = Field(..., description="Message content")
     role: str = Field(..., description="Message role: 'user', 'assistant', or 'system'")
     message_type: str = Field(default="text", description="Message type: 'text', 'image', 'file'")
-    metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+    # ORM objects expose the column as meta
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta", "metadata"), description="Additional metadata")
 
 
 class MessageCreate(MessageBase):
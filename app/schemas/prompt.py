@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 
 
 class PromptBase(BaseModel):
@@ -58,7 +58,7 @@ class Prompt(PromptBase):
     version: str
     changelog: Optional[str] = None
     tags: Optional[str] = None
-    metadata: Optional[str] = None  # JSON string in DB
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta", "metadata"), description="Additional metadata")
     created_at: datetime
     updated_at: datetime
 
@@ -1,10 +1,10 @@
 """Analytics service for tracking usage metrics and statistics."""
 
 import asyncio
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, text
+from sqlalchemy import select, func, and_, or_, delete
 
 from app.models.analytics import Analytics
 from app.models.user import User
@@ -41,7 +41,7 @@ class AnalyticsService:
         Returns:
             Created analytics record
         """
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         
         analytics = Analytics(
             date=now.date(),
@@ -55,7 +55,7 @@ class AnalyticsService:
             token_count=event_data.token_count,
             tokens_per_second=event_data.tokens_per_second,
             estimated_cost=event_data.estimated_cost,
-            metadata=str(event_data.metadata) if event_data.metadata else None,
+            meta=event_data.metadata,
             error_type=event_data.error_type,
             error_message=event_data.error_message
         )
@@ -211,7 +211,7 @@ class AnalyticsService:
         Returns:
             List of usage metrics
         """
-        end_date = datetime.utcnow()
+        end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days_back)
         
         # Build time grouping based on period
@@ -443,18 +443,11 @@ class AnalyticsService:
         """
         cutoff_date = date.today() - timedelta(days=days_to_keep)
         
-        # Count records to be deleted
-        count_result = await self.db.execute(
-            select(func.count(Analytics.id)).where(Analytics.date < cutoff_date)
-        )
-        records_to_delete = count_result.scalar()
-        
-        # Delete old records
-        await self.db.execute(
-            text("DELETE FROM analytics WHERE date < :cutoff_date").bindparam(
-                cutoff_date=cutoff_date
-            )
+        # Delete old records in one statement; rowcount gives the number removed
+        result = await self.db.execute(
+            delete(Analytics).where(Analytics.date < cutoff_date)
         )
+        records_to_delete = result.rowcount
         await self.db.commit()
         
         logger.info(
@@ -1,10 +1,12 @@
 """Authentication service for user management and authentication."""
 
+import asyncio
+import secrets
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import bindparam, inspect, select
+from sqlalchemy.orm import make_transient_to_detached, selectinload
 
 from app.models.user import User
 from app.models.profile import Profile
@@ -12,9 +14,43 @@ from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
 from app.core.exceptions import AuthenticationError, ConflictError, NotFoundError
 from app.core.logging import get_logger
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 
+# User lookups run on every authenticated request; built once, bound per call
+# (unique columns, so LIMIT 1 lets the driver stop after the first row)
+_GET_USER_BY_ID = select(User).where(User.id == bindparam("user_id")).limit(1)
+_GET_USER_BY_USERNAME = select(User).where(User.username == bindparam("username")).limit(1)
+_GET_USER_BY_EMAIL = select(User).where(User.email == bindparam("email")).limit(1)
+_USERNAME_EXISTS = select(1).where(User.username == bindparam("username")).limit(1)
+
+# Hashed once at import. Logins for unknown users are checked against it so
+# they take as long as a wrong password, without hashing anything per request
+_DUMMY_PASSWORD_HASH = get_password_hash(secrets.token_urlsafe(16))
+
+# Users resolved from access tokens, keyed by username. Entries are frozen
+# tuples of column values, never ORM objects, and leave out the password
+# hash; update_user evicts the users it changes
+_user_cache = TTLCache(maxsize=10_000, ttl=5.0)
+
+# User columns held in _user_cache entries, in tuple order
+_CACHED_USER_COLUMNS = tuple(
+    attr.key for attr in inspect(User).column_attrs if attr.key != "hashed_password"
+)
+
+
+def _user_snapshot(user: User) -> tuple:
+    """Capture a user's cacheable column values as an immutable tuple."""
+    return tuple(getattr(user, key) for key in _CACHED_USER_COLUMNS)
+
+
+def _user_from_snapshot(snapshot: tuple) -> User:
+    """Build a detached user, private to the caller, from a cached snapshot."""
+    user = User(**dict(zip(_CACHED_USER_COLUMNS, snapshot)))
+    make_transient_to_detached(user)
+    return user
+
 
 class AuthService:
     """Service for user authentication and management."""
@@ -22,12 +58,14 @@ class AuthService:
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
     
-    async def create_user(self, user_data: UserCreate) -> User:
+    async def create_user(self, user_data: UserCreate, is_superuser: bool = False) -> User:
         """
         Create a new user.
         
         Args:
             user_data: User creation data
+            is_superuser: Grant superuser rights on creation. Deliberately not
+                part of UserCreate, which is the public registration payload.
             
         Returns:
             Created user
@@ -36,8 +74,7 @@ class AuthService:
             ConflictError: If username or email already exists
         """
         # Check if username already exists
-        existing_user = await self.get_user_by_username(user_data.username)
-        if existing_user:
+        if await self.user_exists(user_data.username):
             raise ConflictError(f"Username '{user_data.username}' already exists")
         
         # Check if email already exists
@@ -46,21 +83,25 @@ class AuthService:
             raise ConflictError(f"Email '{user_data.email}' already exists")
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        # bcrypt takes a few hundred milliseconds; keep it off the event loop
+        hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
         user = User(
             username=user_data.username,
             email=user_data.email,
             full_name=user_data.full_name,
             hashed_password=hashed_password,
-            is_active=user_data.is_active
+            is_active=user_data.is_active,
+            is_superuser=is_superuser
         )
         
+        # The flush fetches the id and server-side timestamps through
+        # INSERT ... RETURNING, so neither row needs a refresh afterwards
         self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        await self.db.flush()
         
-        # Create default profile
-        await self._create_default_profile(user)
+        # Create default profile in the same transaction
+        self._add_default_profile(user)
+        await self.db.commit()
         
         logger.info("User created", user_id=user.id, username=user.username)
         return user
@@ -80,7 +121,12 @@ class AuthService:
         if not user:
             user = await self.get_user_by_email(username)
         
-        if not user or not verify_password(password, user.hashed_password):
+        if not user:
+            await asyncio.to_thread(verify_password, password, _DUMMY_PASSWORD_HASH)
+            logger.warning("Authentication failed", username=username)
+            return None
+        
+        if not await asyncio.to_thread(verify_password, password, user.hashed_password):
             logger.warning("Authentication failed", username=username)
             return None
         
@@ -89,7 +135,7 @@ class AuthService:
             return None
         
         # Update last login
-        user.last_login = datetime.utcnow()
+        user.last_login = datetime.now(timezone.utc)
         await self.db.commit()
         
         logger.info("User authenticated", user_id=user.id, username=user.username)
@@ -105,10 +151,8 @@ class AuthService:
         Returns:
             User or None if not found
         """
-        result = await self.db.execute(
-            select(User).where(User.id == user_id)
-        )
-        return result.scalar_one_or_none()
+        result = await self.db.execute(_GET_USER_BY_ID, {"user_id": user_id})
+        return result.scalars().first()
     
     async def get_user_by_username(self, username: str) -> Optional[User]:
         """
@@ -120,10 +164,46 @@ class AuthService:
         Returns:
             User or None if not found
         """
-        result = await self.db.execute(
-            select(User).where(User.username == username)
-        )
-        return result.scalar_one_or_none()
+        result = await self.db.execute(_GET_USER_BY_USERNAME, {"username": username})
+        return result.scalars().first()
+    
+    async def user_exists(self, username: str) -> bool:
+        """
+        Check whether a username is taken without loading the user.
+        
+        Args:
+            username: Username
+            
+        Returns:
+            True if a user with this username exists
+        """
+        result = await self.db.scalar(_USERNAME_EXISTS, {"username": username})
+        return result is not None
+    
+    async def get_cached_user_by_username(self, username: str) -> Optional[User]:
+        """
+        Get user by username for request authentication.
+        
+        Lookups are cached for a few seconds, so a burst of requests with
+        the same token costs one query. Each call returns its own detached
+        user: its columns other than hashed_password are loaded, but
+        relationships cannot be lazy-loaded, so load the row with
+        get_user_by_id when they are needed.
+        
+        Args:
+            username: Username
+            
+        Returns:
+            User or None if not found
+        """
+        snapshot = _user_cache.get(username)
+        if snapshot is None:
+            user = await self.get_user_by_username(username)
+            if user is None:
+                return None
+            snapshot = _user_snapshot(user)
+            _user_cache.set(username, snapshot)
+        return _user_from_snapshot(snapshot)
     
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """
@@ -135,10 +215,8 @@ class AuthService:
         Returns:
             User or None if not found
         """
-        result = await self.db.execute(
-            select(User).where(User.email == email)
-        )
-        return result.scalar_one_or_none()
+        result = await self.db.execute(_GET_USER_BY_EMAIL, {"email": email})
+        return result.scalars().first()
     
     async def update_user(self, user_id: int, user_data: UserUpdate) -> User:
         """
@@ -170,21 +248,24 @@ class AuthService:
             if existing and existing.id != user_id:
                 raise ConflictError(f"Email '{user_data.email}' already exists")
         
+        _user_cache.pop(user.username)
+        
         # Update fields
         for field, value in user_data.model_dump(exclude_unset=True).items():
             if field == "password":
-                user.hashed_password = get_password_hash(value)
+                user.hashed_password = await asyncio.to_thread(get_password_hash, value)
             else:
                 setattr(user, field, value)
         
         await self.db.commit()
         await self.db.refresh(user)
+        _user_cache.pop(user.username)
         
         logger.info("User updated", user_id=user.id, username=user.username)
         return user
     
-    async def _create_default_profile(self, user: User) -> Profile:
-        """Create a default profile for a new user."""
+    def _add_default_profile(self, user: User) -> Profile:
+        """Add a default profile for a new user to the session."""
         profile = Profile(
             user_id=user.id,
             name="Default",
@@ -193,7 +274,4 @@ class AuthService:
         )
         
         self.db.add(profile)
-        await self.db.commit()
-        await self.db.refresh(profile)
-        
         return profile
\ No newline at end of file
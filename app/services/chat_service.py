@@ -1,26 +1,117 @@
 """Chat service for managing conversations and messages."""
 
 import asyncio
+import hashlib
 import time
-from typing import List, Optional, Dict, Any, AsyncGenerator
+from contextlib import aclosing
+from typing import List, NamedTuple, Optional, Dict, Any, AsyncGenerator, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, bindparam, insert, select, func, update
+from sqlalchemy.orm import joinedload
 
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.models.user import User
 from app.models.conversation import Conversation
 from app.models.message import Message
 from app.models.profile import Profile
 from app.schemas.chat import ChatMessage, ChatRequest, ChatResponse, StreamingChatResponse
-from app.schemas.conversation import ConversationCreate
-from app.services.llm_service import LLMService
+from app.schemas.conversation import ConversationCreate, ConversationSummary, ConversationUpdate
+from app.services.llm_service import LLMService, count_tokens
 from app.services.vector_service import VectorService
 from app.core.exceptions import NotFoundError, ValidationError
 from app.core.logging import get_logger
+from app.utils.cache import TTLCache
+from app.utils.helpers import create_background_task
 
 logger = get_logger(__name__)
 
+# Hot-path statements, built once and executed with bound parameters
+_GET_CONVERSATION = select(Conversation).where(
+    Conversation.id == bindparam("conversation_id"),
+    Conversation.user_id == bindparam("user_id"),
+    Conversation.is_active == True
+)
+_GET_CONVERSATION_WITH_MESSAGES = _GET_CONVERSATION.options(
+    joinedload(Conversation.messages)
+)
+_GET_PROFILE = select(Profile).where(
+    Profile.id == bindparam("profile_id"),
+    Profile.user_id == bindparam("user_id"),
+    Profile.is_active == True
+)
+_GET_DEFAULT_PROFILE = select(Profile).where(
+    Profile.user_id == bindparam("user_id"),
+    Profile.is_default == True,
+    Profile.is_active == True
+)
+# Messages of a conversation loaded as LLM context
+RECENT_MESSAGE_LIMIT = 20
+
+# Recent messages newer than after_id (0 for all), newest first
+_RECENT_MESSAGES = (
+    select(Message)
+    .where(
+        Message.conversation_id == bindparam("conversation_id"),
+        Message.is_deleted == False,
+        Message.id > bindparam("after_id")
+    )
+    .order_by(Message.created_at.desc(), Message.id.desc())
+    .limit(RECENT_MESSAGE_LIMIT)  # Limit context to recent messages
+)
+
+# Messages folded into the running summary, newest first; the oldest are
+# left out when a long unsummarized backlog exceeds the limit
+_SUMMARY_SOURCE_LIMIT = 100
+_MESSAGES_TO_SUMMARIZE = (
+    select(Message)
+    .where(
+        Message.conversation_id == bindparam("conversation_id"),
+        Message.is_deleted == False,
+        Message.id > bindparam("after_id"),
+        Message.id <= bindparam("through_id")
+    )
+    .order_by(Message.created_at.desc(), Message.id.desc())
+    .limit(_SUMMARY_SOURCE_LIMIT)
+)
+
+# Profile memory type that replaces dropped history with a running summary
+SUMMARY_MEMORY_TYPE = "conversation_summary_buffer"
+
+# context_settings key holding the running summary and the ID of the newest
+# message it covers
+HISTORY_SUMMARY_KEY = "history_summary"
+
+# Conversation fields that may be omitted from an update but not set to null
+_NON_NULLABLE_CONVERSATION_FIELDS = ("title", "is_active")
+
+# Characters of the last message shown in conversation lists
+MESSAGE_PREVIEW_LENGTH = 100
+
+# Retrieval results keyed by (user_id, query digest, top_k, threshold). Only
+# the formatted context and source references are kept, never ORM documents,
+# so entries stay small and hold no document content.
+_retrieval_cache = TTLCache(maxsize=10_000, ttl=300)
+
+
+class SourceRef(NamedTuple):
+    """Reference to a retrieved document, as reported in chat responses."""
+    document_id: int
+    filename: str
+    similarity_score: float
+    relevant_chunks: Tuple[str, ...]
+
+
+def invalidate_retrieval_cache() -> None:
+    """
+    Drop all cached retrieval results.
+    
+    Called when documents are deleted, changed or become searchable, since
+    any user's cached results may reference a public document.
+    """
+    _retrieval_cache.clear()
+
 
 class ChatService:
     """Service for managing chat conversations and messages."""
@@ -39,7 +130,8 @@ class ChatService:
         self, 
         user: User, 
         title: str,
-        context_settings: Optional[Dict[str, Any]] = None
+        context_settings: Optional[Dict[str, Any]] = None,
+        commit: bool = True
     ) -> Conversation:
         """
         Create a new conversation.
@@ -48,6 +140,8 @@ class ChatService:
             user: User creating the conversation
             title: Conversation title
             context_settings: Optional LLM context settings
+            commit: Commit immediately; if False the insert is only flushed
+                and the caller owns the transaction
             
         Returns:
             Created conversation
@@ -55,12 +149,15 @@ class ChatService:
         conversation = Conversation(
             title=title,
             user_id=user.id,
-            context_settings=str(context_settings) if context_settings else None
+            context_settings=context_settings or None
         )
         
         self.db.add(conversation)
-        await self.db.commit()
-        await self.db.refresh(conversation)
+        if commit:
+            await self.db.commit()
+            await self.db.refresh(conversation)
+        else:
+            await self.db.flush()
         
         logger.info("Conversation created", conversation_id=conversation.id, user_id=user.id)
         return conversation
@@ -83,18 +180,16 @@ class ChatService:
             Conversation
             
         Raises:
-            NotFoundError: If conversation not found or access denied
+            NotFoundError: If conversation not found, deleted or access denied
         """
-        query = select(Conversation).where(
-            Conversation.id == conversation_id,
-            Conversation.user_id == user.id
-        )
+        # Single row parent, so a JOIN fetches messages in the same round-trip
+        query = _GET_CONVERSATION_WITH_MESSAGES if include_messages else _GET_CONVERSATION
         
-        if include_messages:
-            query = query.options(selectinload(Conversation.messages))
-        
-        result = await self.db.execute(query)
-        conversation = result.scalar_one_or_none()
+        result = await self.db.execute(
+            query,
+            {"conversation_id": conversation_id, "user_id": user.id}
+        )
+        conversation = result.unique().scalar_one_or_none()
         
         if not conversation:
             raise NotFoundError(f"Conversation {conversation_id} not found")
@@ -128,9 +223,148 @@ class ChatService:
         query = query.order_by(Conversation.updated_at.desc()).offset(offset).limit(limit)
         
         result = await self.db.execute(query)
-        conversations = result.scalars().all()
         
-        return list(conversations)
+        return list(result.scalars())
+    
+    async def get_conversation_summaries(
+        self,
+        user: User,
+        limit: int = 50,
+        offset: int = 0,
+        include_inactive: bool = False
+    ) -> List[ConversationSummary]:
+        """
+        Get conversation summaries with a preview of each last message.
+        
+        The latest message per conversation is picked with a window function
+        and outer-joined, so the page and its previews come back in one query.
+        
+        Args:
+            user: User requesting conversations
+            limit: Maximum number of conversations
+            offset: Offset for pagination
+            include_inactive: Whether to include inactive conversations
+            
+        Returns:
+            List of conversation summaries
+        """
+        last_message = (
+            select(
+                Message.conversation_id,
+                func.substr(Message.content, 1, MESSAGE_PREVIEW_LENGTH).label("preview"),
+                func.row_number().over(
+                    partition_by=Message.conversation_id,
+                    order_by=(Message.created_at.desc(), Message.id.desc())
+                ).label("rn")
+            )
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .where(Conversation.user_id == user.id, Message.is_deleted == False)
+            .subquery()
+        )
+        
+        query = (
+            select(Conversation, last_message.c.preview)
+            .outerjoin(
+                last_message,
+                and_(
+                    last_message.c.conversation_id == Conversation.id,
+                    last_message.c.rn == 1
+                )
+            )
+            .where(Conversation.user_id == user.id)
+        )
+        
+        if not include_inactive:
+            query = query.where(Conversation.is_active == True)
+        
+        query = query.order_by(Conversation.updated_at.desc()).offset(offset).limit(limit)
+        
+        result = await self.db.execute(query)
+        
+        summaries = []
+        for conversation, preview in result:
+            summary = ConversationSummary.model_validate(conversation)
+            summary.last_message_preview = preview
+            summaries.append(summary)
+        
+        return summaries
+    
+    async def update_conversation(
+        self,
+        conversation_id: int,
+        user: User,
+        update_data: ConversationUpdate
+    ) -> Conversation:
+        """
+        Update conversation metadata.
+        
+        Args:
+            conversation_id: Conversation ID
+            user: User updating the conversation (must own it)
+            update_data: Updated conversation data
+            
+        Returns:
+            Updated conversation
+            
+        Raises:
+            NotFoundError: If conversation not found
+            ValidationError: If a required field is explicitly set to null
+        """
+        values = update_data.model_dump(exclude_unset=True)
+        for field in _NON_NULLABLE_CONVERSATION_FIELDS:
+            if field in values and values[field] is None:
+                raise ValidationError(f"{field} cannot be null")
+        if "context_settings" in values:
+            values["context_settings"] = values["context_settings"] or None
+        
+        # UPDATE ... RETURNING fetches the row in the same round-trip
+        result = await self.db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user.id
+            )
+            .values(**values, updated_at=func.now())
+            .returning(Conversation)
+        )
+        conversation = result.scalar_one_or_none()
+        
+        if not conversation:
+            raise NotFoundError(f"Conversation {conversation_id} not found")
+        
+        await self.db.commit()
+        
+        logger.info("Conversation updated", conversation_id=conversation_id, user_id=user.id)
+        return conversation
+    
+    async def delete_conversation(self, conversation_id: int, user: User) -> None:
+        """
+        Delete a conversation (soft delete).
+        
+        Args:
+            conversation_id: Conversation ID
+            user: User deleting the conversation (must own it)
+            
+        Raises:
+            NotFoundError: If conversation not found or already deleted
+        """
+        result = await self.db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user.id,
+                Conversation.is_active == True
+            )
+            .values(is_active=False, updated_at=func.now())
+            .returning(Conversation.id)
+        )
+        
+        if result.first() is None:
+            raise NotFoundError(f"Conversation {conversation_id} not found")
+        
+        await self.db.commit()
+        
+        logger.info("Conversation deleted", conversation_id=conversation_id, user_id=user.id)
     
     async def send_message(
         self,
@@ -147,7 +381,7 @@ class ChatService:
         Returns:
             Chat response with AI message
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Get or create conversation
         if chat_request.conversation_id:
@@ -155,46 +389,21 @@ class ChatService:
         else:
             conversation = await self.create_conversation(
                 user=user,
-                title=chat_request.message[:50] + "..." if len(chat_request.message) > 50 else chat_request.message
+                title=chat_request.message[:50] + "..." if len(chat_request.message) > 50 else chat_request.message,
+                commit=False
             )
         
         # Get profile settings
         profile = await self._get_user_profile(user, chat_request.profile_id)
         
-        # Save user message
-        user_message = await self._save_message(
-            conversation_id=conversation.id,
-            content=chat_request.message,
-            role="user"
-        )
-        
-        # Build context for LLM
-        messages = await self._build_conversation_context(
+        # Build context for LLM and retrieve relevant documents
+        messages, sources = await self._prepare_messages(
+            chat_request,
             conversation,
             profile,
-            chat_request.context
+            user
         )
         
-        # Add current user message
-        messages.append(ChatMessage(role="user", content=chat_request.message))
-        
-        # Get relevant documents if retrieval is enabled
-        sources = []
-        if chat_request.use_retrieval and profile.retrieval_enabled:
-            sources = await self._retrieve_relevant_documents(
-                chat_request.message,
-                user,
-                profile
-            )
-            
-            # Add retrieved documents to context
-            if sources:
-                context_content = self._format_retrieval_context(sources)
-                messages.insert(-1, ChatMessage(
-                    role="system",
-                    content=f"Relevant information from documents:\n{context_content}"
-                ))
-        
         # Generate AI response
         llm_response = await self.llm_service.generate_response(
             messages=messages,
@@ -204,11 +413,11 @@ class ChatService:
             stream=False
         )
         
-        # Save AI message
-        ai_message = await self._save_message(
+        # Save user message and AI reply
+        user_message_id, ai_message_id = await self._save_exchange(
             conversation_id=conversation.id,
-            content=llm_response["content"],
-            role="assistant",
+            user_content=chat_request.message,
+            ai_content=llm_response["content"],
             token_count=llm_response["token_count"],
             processing_time=llm_response["processing_time"],
             model_used=llm_response["model_used"],
@@ -221,10 +430,16 @@ class ChatService:
         # Update profile usage
         await self._update_profile_usage(profile, llm_response["token_count"])
         
+        # Persist conversation, messages and statistics together
+        await self.db.commit()
+        
         # Generate embeddings for messages (background task)
-        asyncio.create_task(self._generate_message_embeddings(user_message, ai_message))
+        create_background_task(self._generate_message_embeddings(
+            (user_message_id, "user", chat_request.message),
+            (ai_message_id, "assistant", llm_response["content"])
+        ))
         
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         
         logger.info(
             "Chat message processed",
@@ -237,15 +452,15 @@ class ChatService:
         return ChatResponse(
             message=llm_response["content"],
             conversation_id=conversation.id,
-            message_id=ai_message.id,
+            message_id=ai_message_id,
             model_used=llm_response["model_used"],
             token_count=llm_response["token_count"],
             processing_time=processing_time,
             sources=[{
-                "document_id": source.document.id,
-                "filename": source.document.filename,
+                "document_id": source.document_id,
+                "filename": source.filename,
                 "similarity_score": source.similarity_score,
-                "relevant_chunks": source.relevant_chunks
+                "relevant_chunks": list(source.relevant_chunks)
             } for source in sources],
             metadata=chat_request.metadata
         )
@@ -271,70 +486,58 @@ class ChatService:
         else:
             conversation = await self.create_conversation(
                 user=user,
-                title=chat_request.message[:50] + "..." if len(chat_request.message) > 50 else chat_request.message
+                title=chat_request.message[:50] + "..." if len(chat_request.message) > 50 else chat_request.message,
+                commit=False
             )
         
         # Get profile settings
         profile = await self._get_user_profile(user, chat_request.profile_id)
         
-        # Save user message
-        user_message = await self._save_message(
-            conversation_id=conversation.id,
-            content=chat_request.message,
-            role="user"
-        )
-        
-        # Build context for LLM
-        messages = await self._build_conversation_context(
+        # Build context for LLM and retrieve relevant documents
+        messages, sources = await self._prepare_messages(
+            chat_request,
             conversation,
             profile,
-            chat_request.context
+            user
         )
         
-        # Add current user message
-        messages.append(ChatMessage(role="user", content=chat_request.message))
+        # Persist the user message (and a new conversation) before streaming,
+        # so a disconnect or stream error cannot lose them
+        user_message_id = await self._save_message(
+            conversation_id=conversation.id,
+            content=chat_request.message,
+            role="user"
+        )
+        await self.db.commit()
         
-        # Get relevant documents if retrieval is enabled
-        sources = []
-        if chat_request.use_retrieval and profile.retrieval_enabled:
-            sources = await self._retrieve_relevant_documents(
-                chat_request.message,
-                user,
-                profile
-            )
-            
-            # Add retrieved documents to context
-            if sources:
-                context_content = self._format_retrieval_context(sources)
-                messages.insert(-1, ChatMessage(
-                    role="system",
-                    content=f"Relevant information from documents:\n{context_content}"
-                ))
-        
-        # Stream AI response
-        full_response = ""
+        # Stream AI response; chunks are joined once at the end
+        response_parts: List[str] = []
         ai_message_id = None
-        token_count = 0
         
-        async for chunk in self.llm_service.stream_response(
+        llm_stream = self.llm_service.stream_response(
             messages=messages,
             system_prompt=profile.system_prompt,
             temperature=chat_request.temperature or profile.temperature,
             max_tokens=chat_request.max_tokens or profile.max_tokens
-        ):
-            full_response += chunk
-            token_count += 1  # Rough token count
-            
-            yield StreamingChatResponse(
-                delta=chunk,
-                conversation_id=conversation.id,
-                message_id=ai_message_id,
-                finished=False,
-                metadata=chat_request.metadata
-            )
+        )
+        async with aclosing(llm_stream):
+            async for chunk in llm_stream:
+                response_parts.append(chunk)
+                
+                # Fields are already typed, so skip per-token validation
+                yield StreamingChatResponse.model_construct(
+                    delta=chunk,
+                    conversation_id=conversation.id,
+                    message_id=ai_message_id,
+                    finished=False,
+                    metadata=chat_request.metadata
+                )
         
-        # Save complete AI message
-        ai_message = await self._save_message(
+        full_response = "".join(response_parts)
+        token_count = len(response_parts)  # Rough token count
+        
+        # Save complete AI reply
+        ai_message_id = await self._save_message(
             conversation_id=conversation.id,
             content=full_response,
             role="assistant",
@@ -345,21 +548,25 @@ class ChatService:
         # Update conversation and profile statistics
         await self._update_conversation_stats(conversation, token_count)
         await self._update_profile_usage(profile, token_count)
+        await self.db.commit()
         
         # Generate embeddings (background task)
-        asyncio.create_task(self._generate_message_embeddings(user_message, ai_message))
+        create_background_task(self._generate_message_embeddings(
+            (user_message_id, "user", chat_request.message),
+            (ai_message_id, "assistant", full_response)
+        ))
         
         # Send final chunk with completion info
         yield StreamingChatResponse(
             delta="",
             conversation_id=conversation.id,
-            message_id=ai_message.id,
+            message_id=ai_message_id,
             finished=True,
             metadata={
                 "token_count": token_count,
                 "sources": [{
-                    "document_id": source.document.id,
-                    "filename": source.document.filename,
+                    "document_id": source.document_id,
+                    "filename": source.filename,
                     "similarity_score": source.similarity_score
                 } for source in sources]
             }
@@ -369,11 +576,8 @@ class ChatService:
         """Get user profile for LLM settings."""
         if profile_id:
             result = await self.db.execute(
-                select(Profile).where(
-                    Profile.id == profile_id,
-                    Profile.user_id == user.id,
-                    Profile.is_active == True
-                )
+                _GET_PROFILE,
+                {"profile_id": profile_id, "user_id": user.id}
             )
             profile = result.scalar_one_or_none()
             if not profile:
@@ -381,11 +585,8 @@ class ChatService:
         else:
             # Get default profile
             result = await self.db.execute(
-                select(Profile).where(
-                    Profile.user_id == user.id,
-                    Profile.is_default == True,
-                    Profile.is_active == True
-                )
+                _GET_DEFAULT_PROFILE,
+                {"user_id": user.id}
             )
             profile = result.scalar_one_or_none()
             if not profile:
@@ -402,23 +603,161 @@ class ChatService:
         processing_time: Optional[float] = None,
         model_used: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> Message:
-        """Save a message to the database."""
-        message = Message(
-            conversation_id=conversation_id,
-            content=content,
-            role=role,
-            token_count=token_count,
-            processing_time=processing_time,
-            model_used=model_used,
-            metadata=str(metadata) if metadata else None
+    ) -> int:
+        """
+        Insert a single message; the caller commits.
+        
+        Returns:
+            ID of the new message
+        """
+        result = await self.db.execute(
+            insert(Message)
+            .values(
+                conversation_id=conversation_id,
+                content=content,
+                role=role,
+                token_count=token_count,
+                processing_time=processing_time,
+                model_used=model_used,
+                meta=metadata
+            )
+            .returning(Message.id)
         )
+        return result.scalar_one()
+    
+    async def _save_exchange(
+        self,
+        conversation_id: int,
+        user_content: str,
+        ai_content: str,
+        token_count: int = 0,
+        processing_time: Optional[float] = None,
+        model_used: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, int]:
+        """
+        Insert a user message and its AI reply; the caller commits.
         
-        self.db.add(message)
-        await self.db.commit()
-        await self.db.refresh(message)
+        Both rows go in as one multi-row INSERT ... RETURNING, so saving an
+        exchange costs a single round-trip.
         
-        return message
+        Returns:
+            Tuple of (user message ID, AI message ID)
+        """
+        result = await self.db.execute(
+            insert(Message)
+            .values([
+                {
+                    "conversation_id": conversation_id,
+                    "content": user_content,
+                    "role": "user",
+                    "token_count": 0,
+                    "processing_time": None,
+                    "model_used": None,
+                    "meta": None
+                },
+                {
+                    "conversation_id": conversation_id,
+                    "content": ai_content,
+                    "role": "assistant",
+                    "token_count": token_count,
+                    "processing_time": processing_time,
+                    "model_used": model_used,
+                    "meta": metadata
+                }
+            ])
+            .returning(Message.id, Message.role)
+        )
+        message_ids = {role: message_id for message_id, role in result.all()}
+        
+        return message_ids["user"], message_ids["assistant"]
+    
+    async def _prepare_messages(
+        self,
+        chat_request: ChatRequest,
+        conversation: Conversation,
+        profile: Profile,
+        user: User
+    ) -> Tuple[List[ChatMessage], List[SourceRef]]:
+        """
+        Build the LLM message list and retrieve relevant documents.
+        
+        The history query and the query embedding are independent, so they
+        run concurrently. The vector search shares the session with the
+        history query and runs afterwards. Retrieval results are cached per
+        user and normalized query, so repeated prompts skip both the
+        embedding and the search.
+        
+        Raises:
+            ValidationError: If the message alone exceeds the profile's
+                context window
+        """
+        # Reject oversized prompts locally rather than after an API error
+        if count_tokens([chat_request.message])[0] > profile.context_window:
+            raise ValidationError(
+                f"Message exceeds the {profile.context_window} token context window"
+            )
+        
+        retrieval_enabled = chat_request.use_retrieval and profile.retrieval_enabled
+        cache_key = None
+        retrieval = None
+        if retrieval_enabled:
+            cache_key = self._retrieval_cache_key(chat_request.message, user, profile)
+            retrieval = _retrieval_cache.get(cache_key)
+        
+        query_embedding = None
+        if retrieval_enabled and retrieval is None:
+            messages, query_embedding = await asyncio.gather(
+                self._build_conversation_context(
+                    conversation,
+                    profile,
+                    chat_request.context
+                ),
+                self._embed_query(chat_request.message)
+            )
+        else:
+            messages = await self._build_conversation_context(
+                conversation,
+                profile,
+                chat_request.context
+            )
+        
+        # Add current user message
+        messages.append(ChatMessage(role="user", content=chat_request.message))
+        
+        if query_embedding is not None:
+            results = await self._retrieve_relevant_documents(
+                query_embedding,
+                user,
+                profile
+            )
+            if results:
+                retrieval = (
+                    self._format_retrieval_context(results),
+                    tuple(
+                        SourceRef(
+                            document_id=result.document.id,
+                            filename=result.document.filename,
+                            similarity_score=result.similarity_score,
+                            relevant_chunks=tuple(result.relevant_chunks or ())
+                        )
+                        for result in results
+                    )
+                )
+                # Misses are not cached, so a newly uploaded document is
+                # found on the next turn
+                _retrieval_cache.set(cache_key, retrieval)
+        
+        context_content, sources = retrieval or ("", ())
+        
+        # Add retrieved documents to context
+        if context_content:
+            messages.insert(-1, ChatMessage(
+                role="system",
+                content=f"Relevant information from documents:\n{context_content}"
+            ))
+        
+        return messages, list(sources)
     
     async def _build_conversation_context(
         self,
@@ -426,46 +765,172 @@ class ChatService:
         profile: Profile,
         additional_context: Optional[List[ChatMessage]] = None
     ) -> List[ChatMessage]:
-        """Build conversation context for LLM."""
+        """
+        Build conversation context for LLM.
+        
+        History is kept newest-first until the profile's memory_max_tokens
+        budget is spent, so older turns are dropped before they are sent.
+        
+        Profiles using the summary buffer memory type keep a running summary
+        in the conversation's context_settings, with the ID of the newest
+        message it covers; only messages after that are loaded. When they
+        overflow the budget or the recent window, the older ones are folded
+        into the summary, leaving at most half of each so that the next
+        several turns reuse the stored summary without another LLM call.
+        The caller commits the updated summary with the turn.
+        
+        Stored history comes first and per-request context after it, so
+        consecutive turns share a prompt prefix the provider can cache.
+        """
         messages = []
         
-        # Add additional context if provided
-        if additional_context:
-            messages.extend(additional_context)
+        summarize = profile.memory_type == SUMMARY_MEMORY_TYPE
+        stored = (conversation.context_settings or {}).get(HISTORY_SUMMARY_KEY)
+        if not summarize or not isinstance(stored, dict):
+            stored = {}
+        summary = stored.get("text")
+        summarized_through = stored.get("through_message_id") or 0
         
         # Get recent messages from conversation
         result = await self.db.execute(
-            select(Message)
-            .where(
-                Message.conversation_id == conversation.id,
-                Message.is_deleted == False
-            )
-            .order_by(Message.created_at.desc())
-            .limit(20)  # Limit context to recent messages
+            _RECENT_MESSAGES,
+            {"conversation_id": conversation.id, "after_id": summarized_through}
         )
         recent_messages = result.scalars().all()
+        token_counts = count_tokens([message.content for message in recent_messages])
+        
+        # Keep the newest messages that fit in the memory token budget
+        kept = self._messages_within_budget(token_counts, profile.memory_max_tokens)
+        
+        # Fold older turns into the running summary when the profile asks for it
+        overflow = kept < len(recent_messages) or len(recent_messages) == RECENT_MESSAGE_LIMIT
+        if summarize and overflow:
+            keep = min(
+                self._messages_within_budget(token_counts, profile.memory_max_tokens // 2),
+                RECENT_MESSAGE_LIMIT // 2
+            )
+            through_id = recent_messages[keep].id
+            folded = await self._fold_into_summary(
+                conversation,
+                summary,
+                summarized_through,
+                through_id
+            )
+            if folded is not None:
+                summary = folded
+                kept = keep
+        
+        if summary:
+            messages.append(ChatMessage(
+                role="system",
+                content=f"Summary of earlier conversation:\n{summary}"
+            ))
         
         # Convert to ChatMessage format (in chronological order)
-        for message in reversed(recent_messages):
+        for message in reversed(recent_messages[:kept]):
             messages.append(ChatMessage(
                 role=message.role,
                 content=message.content,
                 metadata={"message_id": message.id}
             ))
         
+        # Add additional context if provided
+        if additional_context:
+            messages.extend(additional_context)
+        
         return messages
     
+    @staticmethod
+    def _messages_within_budget(token_counts: List[int], budget: int) -> int:
+        """Count the leading (newest) messages that fit in a token budget."""
+        kept = 0
+        for token_count in token_counts:
+            budget -= token_count
+            if budget < 0:
+                break
+            kept += 1
+        return kept
+    
+    async def _fold_into_summary(
+        self,
+        conversation: Conversation,
+        summary: Optional[str],
+        summarized_through: int,
+        through_id: int
+    ) -> Optional[str]:
+        """
+        Extend the running summary with messages up to through_id.
+        
+        Args:
+            conversation: Conversation whose summary is updated
+            summary: Current summary, if any
+            summarized_through: ID of the newest message already summarized
+            through_id: ID of the newest message to fold in
+            
+        Returns:
+            The new summary, or None if summarization failed
+        """
+        result = await self.db.execute(
+            _MESSAGES_TO_SUMMARIZE,
+            {
+                "conversation_id": conversation.id,
+                "after_id": summarized_through,
+                "through_id": through_id
+            }
+        )
+        history = [
+            ChatMessage(role=message.role, content=message.content)
+            for message in reversed(result.scalars().all())
+        ]
+        if summary:
+            history.insert(0, ChatMessage(
+                role="system",
+                content=f"Summary of earlier conversation: {summary}"
+            ))
+        
+        new_summary = await self._summarize_history(history)
+        if not new_summary:
+            return None
+        
+        # Reassign rather than mutate so the JSONB change is flushed
+        conversation.context_settings = {
+            **(conversation.context_settings or {}),
+            HISTORY_SUMMARY_KEY: {"text": new_summary, "through_message_id": through_id}
+        }
+        return new_summary
+    
+    async def _summarize_history(self, messages: List[ChatMessage]) -> Optional[str]:
+        """Summarize dropped history messages, or None on failure."""
+        try:
+            return await self.llm_service.summarize_messages(messages)
+        except Exception as e:
+            logger.warning("History summarization failed", error=str(e))
+            return None
+    
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
+        """Generate the retrieval embedding for a query, or None on failure."""
+        try:
+            return await self.llm_service.generate_embedding(query)
+        except Exception as e:
+            logger.warning("Query embedding failed", error=str(e))
+            return None
+    
+    def _retrieval_cache_key(self, query: str, user: User, profile: Profile) -> tuple:
+        """Build the retrieval cache key for a query."""
+        digest = hashlib.blake2b(
+            " ".join(query.lower().split()).encode(),
+            digest_size=16
+        ).digest()
+        return (user.id, digest, profile.retrieval_top_k, profile.retrieval_score_threshold)
+    
     async def _retrieve_relevant_documents(
         self,
-        query: str,
+        query_embedding: List[float],
         user: User,
         profile: Profile
-    ) -> List[Any]:
-        """Retrieve relevant documents for the query."""
+    ) -> Optional[List[Any]]:
+        """Retrieve relevant documents for the query embedding, or None on failure."""
         try:
-            # Generate query embedding
-            query_embedding = await self.llm_service.generate_embedding(query)
-            
             # Search documents
             sources = await self.vector_service.search_documents(
                 query_embedding=query_embedding,
@@ -478,19 +943,32 @@ class ChatService:
             
         except Exception as e:
             logger.warning("Document retrieval failed", error=str(e))
-            return []
+            return None
     
     def _format_retrieval_context(self, sources: List[Any]) -> str:
-        """Format retrieved documents for LLM context."""
-        context_parts = []
-        for i, source in enumerate(sources, 1):
-            context_parts.append(
-                f"Document {i}: {source.document.filename}\n"
-                f"Content: {source.document.content[:500]}...\n"
-                f"Relevance: {source.similarity_score:.2f}\n"
-            )
+        """
+        Format retrieved documents for LLM context.
+        
+        Sources arrive best match first and are added until
+        settings.retrieval_context_tokens is spent, so a large top-k cannot
+        overflow the prompt.
+        """
+        context_parts = [
+            f"Document {i}: {source.document.filename}\n"
+            f"Content: {source.document.content[:500]}...\n"
+            f"Relevance: {source.similarity_score:.2f}\n"
+            for i, source in enumerate(sources, 1)
+        ]
+        
+        budget = settings.retrieval_context_tokens
+        kept = 0
+        for token_count in count_tokens(context_parts):
+            budget -= token_count
+            if budget < 0:
+                break
+            kept += 1
         
-        return "\n".join(context_parts)
+        return "\n".join(context_parts[:kept])
     
     async def _update_conversation_stats(self, conversation: Conversation, token_count: int) -> None:
         """Update conversation statistics."""
@@ -504,7 +982,6 @@ class ChatService:
                 updated_at=func.now()
             )
         )
-        await self.db.commit()
     
     async def _update_profile_usage(self, profile: Profile, token_count: int) -> None:
         """Update profile usage statistics."""
@@ -518,14 +995,33 @@ class ChatService:
                 updated_at=func.now()
             )
         )
-        await self.db.commit()
     
-    async def _generate_message_embeddings(self, *messages: Message) -> None:
-        """Generate embeddings for messages (background task)."""
+    async def _generate_message_embeddings(self, *messages: Tuple[int, str, str]) -> None:
+        """
+        Generate embeddings for messages (background task).
+        
+        Runs after the request has finished, so it uses its own session
+        rather than the request-scoped one.
+        
+        Args:
+            *messages: (message_id, role, content) snapshots
+        """
+        to_embed = [
+            (message_id, content)
+            for message_id, role, content in messages
+            if role in ("user", "assistant")
+        ]
+        if not to_embed:
+            return
+        
         try:
-            for message in messages:
-                if message.role in ("user", "assistant"):
-                    embedding = await self.llm_service.generate_embedding(message.content)
-                    await self.vector_service.store_message_embedding(message.id, embedding)
+            # One embeddings request for the whole batch
+            embeddings = await self.llm_service.generate_embeddings(
+                [content for _, content in to_embed]
+            )
+            async with AsyncSessionLocal() as db:
+                vector_service = VectorService(db)
+                for (message_id, _), embedding in zip(to_embed, embeddings):
+                    await vector_service.store_message_embedding(message_id, embedding)
         except Exception as e:
             logger.warning("Failed to generate message embeddings", error=str(e))
\ No newline at end of file
@@ -1,24 +1,59 @@
 """Document service for managing document uploads and processing."""
 
+import base64
+import binascii
 import hashlib
-import asyncio
-from typing import List, Optional, Dict, Any, BinaryIO
 from datetime import datetime
+from typing import List, Optional, Dict, Any, BinaryIO, Tuple
+from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update
+from sqlalchemy import bindparam, select, func, tuple_, update
 
+from app.database import AsyncSessionLocal
 from app.models.user import User
 from app.models.document import Document
 from app.schemas.document import DocumentCreate, DocumentUpdate, DocumentUpload
+from app.services.chat_service import invalidate_retrieval_cache
 from app.services.vector_service import VectorService
-from app.services.llm_service import LLMService
+from app.services.llm_service import get_shared_llm_service
 from app.utils.document_processor import DocumentProcessor
 from app.core.exceptions import ValidationError, NotFoundError, ConflictError
 from app.core.logging import get_logger
+from app.utils.helpers import create_background_task
 from app.config import settings
 
 logger = get_logger(__name__)
 
+# Read size used when streaming uploads
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Extensions accepted for upload, as a set for membership checks
+_ALLOWED_FILE_TYPES = frozenset(settings.allowed_file_types)
+
+# Embedding already computed for identical file content by the same model,
+# by any user and including deleted documents, so re-uploads skip the
+# embedding API call
+_EMBEDDING_BY_CONTENT_HASH = (
+    select(Document.embedding)
+    .where(
+        Document.content_hash == bindparam("content_hash"),
+        Document.embedding_model == bindparam("embedding_model"),
+        Document.embedding.is_not(None)
+    )
+    .limit(1)
+)
+
+# Text already extracted from identical file content of the same type
+_CONTENT_BY_CONTENT_HASH = (
+    select(Document.content)
+    .where(
+        Document.content_hash == bindparam("content_hash"),
+        Document.mime_type == bindparam("mime_type"),
+        Document.content.is_not(None)
+    )
+    .limit(1)
+)
+
 
 class DocumentService:
     """Service for managing document uploads and processing."""
@@ -26,21 +61,24 @@ class DocumentService:
     def __init__(self, db: AsyncSession, vector_service: VectorService) -> None:
         self.db = db
         self.vector_service = vector_service
-        self.llm_service = LLMService()
+        self.llm_service = get_shared_llm_service()
         self.processor = DocumentProcessor()
     
     async def upload_document(
         self,
         user: User,
-        file_content: bytes,
+        file: UploadFile,
         upload_data: DocumentUpload
     ) -> Document:
         """
         Upload and process a document.
         
+        The upload is read in fixed-size chunks to hash it and enforce the
+        size limit, so the whole file is never held in memory at once.
+        
         Args:
             user: User uploading the document
-            file_content: File content as bytes
+            file: Uploaded file, spooled by the framework
             upload_data: Document upload metadata
             
         Returns:
@@ -50,40 +88,48 @@ class DocumentService:
             ValidationError: If file validation fails
             ConflictError: If document already exists
         """
-        # Validate file
-        self._validate_file(file_content, upload_data)
+        # Validate file metadata and declared size before reading anything
+        file_ext = self._get_file_extension(upload_data.filename)
+        self._validate_file(upload_data, file_ext, file.size)
         
         # Generate content hash
-        content_hash = hashlib.sha256(file_content).hexdigest()
+        content_hash, file_size = await self._hash_upload(file)
         
         # Check for duplicate
         existing = await self._check_duplicate(user.id, content_hash)
         if existing:
             raise ConflictError(f"Document with same content already exists: {existing.filename}")
         
-        # Process document content
-        try:
-            processed_content = await self.processor.extract_text(
-                file_content,
-                upload_data.content_type
-            )
-        except Exception as e:
-            logger.error("Document processing failed", error=str(e))
-            raise ValidationError(f"Failed to process document: {str(e)}")
+        # Process document content, unless identical content was already
+        # extracted for an earlier upload
+        processed_content = await self.db.scalar(
+            _CONTENT_BY_CONTENT_HASH,
+            {"content_hash": content_hash, "mime_type": upload_data.content_type}
+        )
+        if processed_content is None:
+            try:
+                await file.seek(0)
+                processed_content = await self.processor.extract_text(
+                    file.file,
+                    upload_data.content_type
+                )
+            except Exception as e:
+                logger.error("Document processing failed", error=str(e))
+                raise ValidationError(f"Failed to process document: {str(e)}")
         
         # Create document record
         document = Document(
             user_id=user.id,
             filename=upload_data.filename,
             original_filename=upload_data.filename,
-            file_type=self._get_file_extension(upload_data.filename),
-            file_size=len(file_content),
+            file_type=file_ext,
+            file_size=file_size,
             mime_type=upload_data.content_type,
             content=processed_content,
             content_hash=content_hash,
             tags=upload_data.tags,
             is_public=upload_data.is_public,
-            metadata=str(upload_data.metadata) if upload_data.metadata else None,
+            meta=upload_data.metadata,
             processing_status="completed"
         )
         
@@ -92,7 +138,11 @@ class DocumentService:
         await self.db.refresh(document)
         
         # Generate embeddings in background
-        asyncio.create_task(self._process_document_embeddings(document))
+        create_background_task(self._process_document_embeddings(
+            document.id,
+            document.content_hash,
+            document.content[:8000]  # Limit content for embedding
+        ))
         
         logger.info(
             "Document uploaded",
@@ -118,20 +168,25 @@ class DocumentService:
         Raises:
             NotFoundError: If document not found or access denied
         """
+        # Record the access and fetch the row in one UPDATE ... RETURNING;
+        # the increment happens in SQL, so concurrent reads are all counted
         result = await self.db.execute(
-            select(Document).where(
+            update(Document)
+            .where(
                 Document.id == document_id,
                 (Document.user_id == user.id) | (Document.is_public == True)
             )
+            .values(
+                access_count=Document.access_count + 1,
+                last_accessed=func.now()
+            )
+            .returning(Document)
         )
         document = result.scalar_one_or_none()
         
         if not document:
             raise NotFoundError(f"Document {document_id} not found")
         
-        # Update access statistics
-        document.access_count += 1
-        document.last_accessed = datetime.utcnow()
         await self.db.commit()
         
         return document
@@ -143,7 +198,8 @@ class DocumentService:
         offset: int = 0,
         file_types: Optional[List[str]] = None,
         tags: Optional[List[str]] = None,
-        include_public: bool = True
+        include_public: bool = True,
+        cursor: Optional[str] = None
     ) -> List[Document]:
         """
         Get documents for a user.
@@ -151,13 +207,18 @@ class DocumentService:
         Args:
             user: User requesting documents
             limit: Maximum number of documents
-            offset: Offset for pagination
+            offset: Offset for pagination, ignored when a cursor is given
             file_types: Filter by file types
             tags: Filter by tags
             include_public: Include public documents
+            cursor: Opaque cursor from encode_cursor for the previous page's
+                last document; keeps deep pages as cheap as the first
             
         Returns:
             List of documents
+            
+        Raises:
+            ValidationError: If the cursor is malformed
         """
         query = select(Document).where(Document.is_active == True)
         
@@ -178,12 +239,19 @@ class DocumentService:
             tag_conditions = [Document.tags.contains(tag) for tag in tags]
             query = query.where(func.or_(*tag_conditions))
         
-        query = query.order_by(Document.created_at.desc()).offset(offset).limit(limit)
+        if cursor:
+            created_at, document_id = self._decode_cursor(cursor)
+            query = query.where(
+                tuple_(Document.created_at, Document.id) < (created_at, document_id)
+            )
+        elif offset:
+            query = query.offset(offset)
+        
+        query = query.order_by(Document.created_at.desc(), Document.id.desc()).limit(limit)
         
         result = await self.db.execute(query)
-        documents = result.scalars().all()
         
-        return list(documents)
+        return list(result.scalars())
     
     async def update_document(
         self,
@@ -219,14 +287,16 @@ class DocumentService:
         
         # Update fields
         for field, value in update_data.model_dump(exclude_unset=True).items():
-            if field == "metadata" and value:
-                setattr(document, field, str(value))
-            else:
-                setattr(document, field, value)
+            if field == "metadata":
+                field = "meta"
+            setattr(document, field, value)
         
         await self.db.commit()
         await self.db.refresh(document)
         
+        # Cached chat retrievals may reference the old state of the document
+        invalidate_retrieval_cache()
+        
         logger.info("Document updated", document_id=document.id, user_id=user.id)
         return document
     
@@ -241,22 +311,27 @@ class DocumentService:
         Raises:
             NotFoundError: If document not found
         """
-        result = await self.db.execute(
-            select(Document).where(
+        # Soft delete in a single UPDATE, without loading the row's content
+        # and embedding just to flip a flag
+        deleted_id = await self.db.scalar(
+            update(Document)
+            .where(
                 Document.id == document_id,
                 Document.user_id == user.id
             )
+            .values(is_active=False)
+            .returning(Document.id)
         )
-        document = result.scalar_one_or_none()
         
-        if not document:
+        if deleted_id is None:
             raise NotFoundError(f"Document {document_id} not found")
         
-        # Soft delete
-        document.is_active = False
         await self.db.commit()
         
-        logger.info("Document deleted", document_id=document.id, user_id=user.id)
+        # Cached chat retrievals must stop returning the deleted document
+        invalidate_retrieval_cache()
+        
+        logger.info("Document deleted", document_id=deleted_id, user_id=user.id)
     
     async def search_documents(
         self,
@@ -394,15 +469,19 @@ class DocumentService:
             "recent_uploads": recent_uploads
         }
     
-    def _validate_file(self, file_content: bytes, upload_data: DocumentUpload) -> None:
-        """Validate uploaded file."""
+    def _validate_file(
+        self,
+        upload_data: DocumentUpload,
+        file_ext: str,
+        file_size: Optional[int] = None
+    ) -> None:
+        """Validate uploaded file metadata and, if known, its declared size."""
         # Check file size
-        if len(file_content) > settings.max_file_size_mb * 1024 * 1024:
+        if file_size is not None and file_size > settings.max_file_size_mb * 1024 * 1024:
             raise ValidationError(f"File size exceeds {settings.max_file_size_mb} MB limit")
         
         # Check file type
-        file_ext = self._get_file_extension(upload_data.filename)
-        if file_ext not in settings.allowed_file_types:
+        if file_ext not in _ALLOWED_FILE_TYPES:
             raise ValidationError(
                 f"File type '{file_ext}' not allowed. "
                 f"Allowed types: {', '.join(settings.allowed_file_types)}"
@@ -412,6 +491,39 @@ class DocumentService:
         if not upload_data.content_type:
             raise ValidationError("Content type is required")
     
+    async def _hash_upload(self, file: UploadFile) -> Tuple[str, int]:
+        """
+        Hash an upload in chunks, enforcing the size limit as it is read.
+        
+        Returns:
+            Tuple of (SHA-256 hex digest, size in bytes)
+        """
+        max_size = settings.max_file_size_mb * 1024 * 1024
+        hasher = hashlib.sha256()
+        file_size = 0
+        
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > max_size:
+                raise ValidationError(f"File size exceeds {settings.max_file_size_mb} MB limit")
+            hasher.update(chunk)
+        
+        return hasher.hexdigest(), file_size
+    
+    def encode_cursor(self, document: Document) -> str:
+        """Encode a document's listing position as an opaque page cursor."""
+        position = f"{document.created_at.isoformat()}|{document.id}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+    
+    def _decode_cursor(self, cursor: str) -> Tuple[datetime, int]:
+        """Decode a page cursor into its (created_at, id) position."""
+        try:
+            position = base64.urlsafe_b64decode(cursor.encode()).decode()
+            created_at, document_id = position.split("|")
+            return datetime.fromisoformat(created_at), int(document_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValidationError("Invalid cursor")
+    
     def _get_file_extension(self, filename: str) -> str:
         """Get file extension from filename."""
         return filename.split(".")[-1].lower() if "." in filename else ""
@@ -427,32 +539,63 @@ class DocumentService:
         )
         return result.scalar_one_or_none()
     
-    async def _process_document_embeddings(self, document: Document) -> None:
-        """Process document embeddings in background."""
-        try:
-            # Update processing status
-            document.processing_status = "processing"
-            await self.db.commit()
-            
-            # Generate embedding for the full document
-            embedding = await self.llm_service.generate_embedding(
-                document.content[:8000]  # Limit content for embedding
-            )
-            
-            # Store embedding
-            await self.vector_service.store_document_embedding(document.id, embedding)
-            
-            # Update processing status
-            document.processing_status = "completed"
-            document.chunk_count = 1  # For now, treating whole document as one chunk
-            await self.db.commit()
-            
-            logger.info("Document embeddings processed", document_id=document.id)
-            
-        except Exception as e:
-            logger.error("Document embedding processing failed", document_id=document.id, error=str(e))
-            
-            # Update error status
-            document.processing_status = "failed"
-            document.processing_error = str(e)
-            await self.db.commit()
\ No newline at end of file
+    async def _process_document_embeddings(
+        self,
+        document_id: int,
+        content_hash: str,
+        content: str
+    ) -> None:
+        """
+        Process document embeddings in background.
+        
+        Runs after the request has finished, so it uses its own session
+        rather than the request-scoped one. The document is updated by ID
+        from the values passed in, without loading it again.
+        
+        Args:
+            document_id: Document ID
+            content_hash: SHA-256 of the uploaded file
+            content: Text to embed
+        """
+        document_row = update(Document).where(Document.id == document_id)
+        
+        async with AsyncSessionLocal() as db:
+            try:
+                # Update processing status
+                await db.execute(document_row.values(processing_status="processing"))
+                await db.commit()
+                
+                # Reuse the embedding of identical content if there is one
+                embedding = await db.scalar(
+                    _EMBEDDING_BY_CONTENT_HASH,
+                    {"content_hash": content_hash, "embedding_model": settings.embedding_model}
+                )
+                if embedding is None:
+                    # Generate embedding for the full document
+                    embedding = await self.llm_service.generate_embedding(content)
+                
+                # Store embedding and update processing status
+                await db.execute(
+                    document_row.values(
+                        embedding=embedding,
+                        embedding_model=settings.embedding_model,
+                        processing_status="completed",
+                        chunk_count=1  # For now, treating whole document as one chunk
+                    )
+                )
+                await db.commit()
+                
+                # The document is now searchable, so cached retrievals are stale
+                invalidate_retrieval_cache()
+                
+                logger.info("Document embeddings processed", document_id=document_id)
+                
+            except Exception as e:
+                logger.error("Document embedding processing failed", document_id=document_id, error=str(e))
+                
+                # Update error status
+                await db.rollback()
+                await db.execute(
+                    document_row.values(processing_status="failed", processing_error=str(e))
+                )
+                await db.commit()
@@ -1,8 +1,13 @@
 """LLM service for managing language model interactions."""
 
 import asyncio
+import functools
+import hashlib
 import time
+from contextlib import aclosing, asynccontextmanager
 from typing import List, Dict, Any, Optional, AsyncGenerator
+import httpx
+import tiktoken
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 from langchain.memory import ConversationBufferMemory
@@ -12,9 +17,173 @@ from app.config import settings
 from app.schemas.chat import ChatMessage
 from app.core.exceptions import LLMError
 from app.core.logging import get_logger
+from app.utils.cache import TTLCache
+from app.utils.helpers import estimate_token_count
+from app.utils.rate_limiter import AsyncRateLimiter
 
 logger = get_logger(__name__)
 
+# Process-wide bound on in-flight chat completion requests
+_llm_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+
+# Client-side request and token rate limits matching the OpenAI account's,
+# so bursts queue locally instead of paying 429 retry backoff
+_request_limiter = (
+    AsyncRateLimiter(settings.llm_requests_per_minute)
+    if settings.llm_requests_per_minute > 0 else None
+)
+_token_limiter = (
+    AsyncRateLimiter(settings.llm_tokens_per_minute)
+    if settings.llm_tokens_per_minute > 0 else None
+)
+
+# Connection pools shared by every OpenAI client, so keep-alive connections
+# survive across requests instead of being set up per service instance.
+# httpx drops idle connections after 5 s by default, which forces a new TLS
+# handshake after any short lull, so idle connections are kept longer.
+# Created on first use and again after close_http_clients.
+_http_limits = httpx.Limits(
+    max_connections=settings.llm_max_connections,
+    max_keepalive_connections=settings.llm_max_keepalive_connections,
+    keepalive_expiry=settings.llm_keepalive_expiry
+)
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+@functools.lru_cache(maxsize=1)
+def _token_encoding() -> Optional[tiktoken.Encoding]:
+    """
+    Get the tokenizer for the configured model, loaded once per process.
+    
+    Returns None when the encoding cannot be loaded (tiktoken fetches its
+    data files on first use), in which case counts fall back to estimates.
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(settings.llm_model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("Tokenizer unavailable, estimating token counts", error=str(e))
+        return None
+
+
+async def load_tokenizer() -> None:
+    """
+    Load the tokenizer off the event loop, at startup.
+    
+    The first load may download tiktoken's BPE file, which would otherwise
+    block the loop during the first request that counts tokens.
+    """
+    await asyncio.to_thread(_token_encoding)
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    """
+    Count the model tokens in each text.
+    
+    Texts are encoded one by one: encode_ordinary_batch builds a new thread
+    pool on every call, which costs more than it saves on the event loop.
+    
+    Args:
+        texts: Texts to measure
+        
+    Returns:
+        Token count for each text
+    """
+    encoding = _token_encoding()
+    if encoding is None:
+        return [estimate_token_count(text) for text in texts]
+    return [len(encoding.encode_ordinary(text)) for text in texts]
+
+
+@asynccontextmanager
+async def _llm_slot(messages: List[Any], max_tokens: int) -> AsyncGenerator[None, None]:
+    """
+    Wait for rate limit capacity and a concurrency slot for a chat call.
+    
+    The token budget charged is the estimated prompt size plus max_tokens,
+    which is how OpenAI counts a request against the tokens-per-minute limit.
+    """
+    if _request_limiter is not None:
+        await _request_limiter.acquire()
+    if _token_limiter is not None:
+        prompt_tokens = sum(count_tokens([message.content for message in messages]))
+        await _token_limiter.acquire(prompt_tokens + max_tokens)
+    
+    async with _llm_semaphore:
+        yield
+
+
+def _http_clients() -> Dict[str, Any]:
+    """Keyword arguments that attach the shared HTTP clients to an OpenAI client."""
+    global _http_client, _http_async_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.Client(limits=_http_limits)
+    if _http_async_client is None or _http_async_client.is_closed:
+        _http_async_client = httpx.AsyncClient(limits=_http_limits)
+    return {"http_client": _http_client, "http_async_client": _http_async_client}
+
+
+# Non-streaming completions keyed by a digest of the exact prompt and
+# sampling parameters; a TTL of 0 disables the cache
+_response_cache = TTLCache(maxsize=1024, ttl=settings.llm_response_cache_ttl)
+
+# Summaries of dropped conversation history, keyed by a digest of the
+# summarized messages so later turns over the same range reuse them
+_summary_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# Token limit and instructions for history summaries
+SUMMARY_MAX_TOKENS = 256
+_SUMMARY_PROMPT = (
+    "Summarize the following conversation in a few sentences. Keep names, "
+    "facts, decisions and open questions; omit pleasantries."
+)
+
+# LangChain message class for each chat role
+_MESSAGE_CLASSES = {
+    "user": HumanMessage,
+    "assistant": AIMessage,
+    "system": SystemMessage
+}
+
+
+async def close_http_clients() -> None:
+    """
+    Close the shared HTTP connection pools.
+    
+    The cached chat models and LLM service hold the closed clients, so they
+    are dropped too; the next use builds new ones on fresh pools.
+    """
+    global _http_client, _http_async_client
+    _chat_model.cache_clear()
+    get_shared_llm_service.cache_clear()
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+    if _http_async_client is not None:
+        await _http_async_client.aclose()
+        _http_async_client = None
+
+
+@functools.lru_cache(maxsize=32)
+def _chat_model(streaming: bool, temperature: float, max_tokens: int) -> ChatOpenAI:
+    """
+    Get a chat model for a parameter combination.
+    
+    Models hold no per-request state, so one instance per combination is
+    shared by all requests instead of being constructed per call.
+    """
+    return ChatOpenAI(
+        openai_api_key=settings.openai_api_key,
+        model_name=settings.llm_model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        streaming=streaming,
+        **_http_clients()
+    )
+
 
 class StreamingCallbackHandler(BaseCallbackHandler):
     """Callback handler for streaming responses."""
@@ -26,7 +195,7 @@ class StreamingCallbackHandler(BaseCallbackHandler):
     
     def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
         """Called when LLM starts running."""
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         self.tokens = []
     
     def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
@@ -35,7 +204,7 @@ class StreamingCallbackHandler(BaseCallbackHandler):
     
     def on_llm_end(self, response: Any, **kwargs: Any) -> None:
         """Called when LLM ends running."""
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
     
     def get_processing_time(self) -> float:
         """Get the total processing time."""
@@ -48,17 +217,12 @@ class LLMService:
     """Service for managing LLM interactions."""
     
     def __init__(self) -> None:
-        self.llm = ChatOpenAI(
-            openai_api_key=settings.openai_api_key,
-            model_name=settings.llm_model,
-            temperature=settings.llm_temperature,
-            max_tokens=settings.llm_max_tokens,
-            streaming=True
-        )
+        self.llm = _chat_model(True, settings.llm_temperature, settings.llm_max_tokens)
         
         self.embeddings = OpenAIEmbeddings(
             openai_api_key=settings.openai_api_key,
-            model=settings.embedding_model
+            model=settings.embedding_model,
+            **_http_clients()
         )
     
     async def generate_response(
@@ -86,46 +250,51 @@ class LLMService:
         """
         try:
             # Configure LLM for this request
-            llm_kwargs = {}
-            if temperature is not None:
-                llm_kwargs["temperature"] = temperature
-            if max_tokens is not None:
-                llm_kwargs["max_tokens"] = max_tokens
-            
-            # Update LLM parameters if provided
-            if llm_kwargs:
-                self.llm = ChatOpenAI(
-                    openai_api_key=settings.openai_api_key,
-                    model_name=settings.llm_model,
-                    streaming=stream,
-                    **llm_kwargs
-                )
+            effective_temperature = settings.llm_temperature if temperature is None else temperature
+            effective_max_tokens = settings.llm_max_tokens if max_tokens is None else max_tokens
+            llm = _chat_model(stream, effective_temperature, effective_max_tokens)
             
             # Convert messages to LangChain format
             langchain_messages = self._convert_messages(messages, system_prompt)
             
+            # Identical non-streaming prompts reuse the stored completion
+            cache_key = None
+            if not stream and _response_cache.ttl > 0:
+                cache_key = self._response_cache_key(
+                    langchain_messages,
+                    effective_temperature,
+                    effective_max_tokens
+                )
+                cached = _response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("LLM response served from cache", model=settings.llm_model)
+                    return {
+                        **cached,
+                        "processing_time": 0.0,
+                        "metadata": {**cached["metadata"], "cached": True}
+                    }
+            
             # Set up callback handler for metrics
             callback_handler = StreamingCallbackHandler()
             
-            start_time = time.time()
-            
-            if stream:
-                # Handle streaming response
-                response_content = ""
-                async for chunk in self._stream_response(langchain_messages, callback_handler):
-                    response_content += chunk
+            async with _llm_slot(langchain_messages, effective_max_tokens):
+                start_time = time.perf_counter()
                 
-                processing_time = callback_handler.get_processing_time()
-                token_count = len(callback_handler.tokens)
-            else:
-                # Handle non-streaming response
-                response = await asyncio.get_event_loop().run_in_executor(
-                    None, 
-                    lambda: self.llm.invoke(langchain_messages, callbacks=[callback_handler])
-                )
-                response_content = response.content
-                processing_time = time.time() - start_time
-                token_count = len(response_content.split())  # Rough token count
+                if stream:
+                    # Handle streaming response
+                    async with aclosing(self._stream_response(
+                        llm, langchain_messages, callback_handler
+                    )) as chunks:
+                        response_content = "".join([chunk async for chunk in chunks])
+                    
+                    processing_time = callback_handler.get_processing_time()
+                    token_count = len(callback_handler.tokens)
+                else:
+                    # Handle non-streaming response
+                    response = await llm.ainvoke(langchain_messages, callbacks=[callback_handler])
+                    response_content = response.content
+                    processing_time = time.perf_counter() - start_time
+                    token_count = len(response_content.split())  # Rough token count
             
             logger.info(
                 "LLM response generated",
@@ -135,7 +304,7 @@ class LLMService:
                 stream=stream
             )
             
-            return {
+            response_data = {
                 "content": response_content,
                 "model_used": settings.llm_model,
                 "token_count": token_count,
@@ -147,6 +316,11 @@ class LLMService:
                 }
             }
             
+            if cache_key is not None:
+                _response_cache.set(cache_key, response_data)
+            
+            return response_data
+            
         except Exception as e:
             logger.error("LLM generation failed", error=str(e))
             raise LLMError(f"Failed to generate response: {str(e)}")
@@ -174,47 +348,107 @@ class LLMService:
         """
         try:
             # Configure LLM for streaming
-            llm_kwargs = {"streaming": True}
-            if temperature is not None:
-                llm_kwargs["temperature"] = temperature
-            if max_tokens is not None:
-                llm_kwargs["max_tokens"] = max_tokens
-            
-            streaming_llm = ChatOpenAI(
-                openai_api_key=settings.openai_api_key,
-                model_name=settings.llm_model,
-                **llm_kwargs
+            effective_max_tokens = settings.llm_max_tokens if max_tokens is None else max_tokens
+            streaming_llm = _chat_model(
+                True,
+                settings.llm_temperature if temperature is None else temperature,
+                effective_max_tokens
             )
             
             # Convert messages to LangChain format
             langchain_messages = self._convert_messages(messages, system_prompt)
             
-            # Stream the response
-            async for chunk in streaming_llm.astream(langchain_messages):
-                if chunk.content:
-                    yield chunk.content
+            # Stream the response, holding a slot for the whole stream; the
+            # upstream stream is closed as soon as this generator is
+            async with (
+                _llm_slot(langchain_messages, effective_max_tokens),
+                aclosing(streaming_llm.astream(langchain_messages)) as stream
+            ):
+                async for chunk in stream:
+                    if chunk.content:
+                        yield chunk.content
                     
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer went away; the upstream stream is already closed
+            logger.info("LLM stream cancelled", model=settings.llm_model)
+            raise
         except Exception as e:
             logger.error("LLM streaming failed", error=str(e))
             raise LLMError(f"Failed to stream response: {str(e)}")
     
+    async def summarize_messages(self, messages: List[ChatMessage]) -> str:
+        """
+        Summarize conversation messages for use as compressed history.
+        
+        Runs at temperature 0 with a small token limit, and summaries are
+        cached by content so an unchanged range is only summarized once.
+        
+        Args:
+            messages: Messages to summarize, in chronological order
+            
+        Returns:
+            Summary text
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for message in messages:
+            digest.update(f"\x1e{message.role}\x1f{message.content}".encode())
+        cache_key = digest.digest()
+        
+        summary = _summary_cache.get(cache_key)
+        if summary is not None:
+            return summary
+        
+        try:
+            transcript = "\n".join(
+                f"{message.role}: {message.content}" for message in messages
+            )
+            llm = _chat_model(False, 0.0, SUMMARY_MAX_TOKENS)
+            summary_messages = [
+                SystemMessage(content=_SUMMARY_PROMPT),
+                HumanMessage(content=transcript)
+            ]
+            
+            async with _llm_slot(summary_messages, SUMMARY_MAX_TOKENS):
+                response = await llm.ainvoke(summary_messages)
+            
+            summary = response.content.strip()
+            _summary_cache.set(cache_key, summary)
+            
+            logger.info("Conversation history summarized", message_count=len(messages))
+            return summary
+            
+        except Exception as e:
+            logger.error("History summarization failed", error=str(e))
+            raise LLMError(f"Failed to summarize messages: {str(e)}")
+    
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of texts.
         
+        Identical texts are embedded once and the vector is reused for each
+        occurrence, so repeated content is not billed twice.
+        
         Args:
             texts: List of texts to embed
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, in the order of texts
         """
         try:
-            embeddings = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.embeddings.embed_documents(texts)
-            )
+            unique_texts = list(dict.fromkeys(texts))
+            unique_embeddings = await self.embeddings.aembed_documents(unique_texts)
             
-            logger.info("Embeddings generated", text_count=len(texts))
+            if len(unique_texts) == len(texts):
+                embeddings = unique_embeddings
+            else:
+                embedding_by_text = dict(zip(unique_texts, unique_embeddings))
+                embeddings = [embedding_by_text[text] for text in texts]
+            
+            logger.info(
+                "Embeddings generated",
+                text_count=len(texts),
+                unique_count=len(unique_texts)
+            )
             return embeddings
             
         except Exception as e:
@@ -232,10 +466,7 @@ class LLMService:
             Embedding vector
         """
         try:
-            embedding = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.embeddings.embed_query(text)
-            )
+            embedding = await self.embeddings.aembed_query(text)
             
             return embedding
             
@@ -248,34 +479,65 @@ class LLMService:
         messages: List[ChatMessage], 
         system_prompt: Optional[str] = None
     ) -> List[Any]:
-        """Convert ChatMessage objects to LangChain message format."""
+        """
+        Convert ChatMessage objects to LangChain message format.
+        
+        The system prompt is always the first message and is normalized, so
+        every turn of a conversation starts with the same prefix and can hit
+        the provider's prompt cache. Callers should keep the system prompt
+        fixed for a conversation and put per-turn content last.
+        """
         langchain_messages = []
         
         # Add system prompt if provided
+        system_prompt = system_prompt.strip() if system_prompt else None
         if system_prompt:
             langchain_messages.append(SystemMessage(content=system_prompt))
         
-        # Convert chat messages
+        # Convert chat messages in one pass, skipping unknown roles
         for message in messages:
-            if message.role == "user":
-                langchain_messages.append(HumanMessage(content=message.content))
-            elif message.role == "assistant":
-                langchain_messages.append(AIMessage(content=message.content))
-            elif message.role == "system":
-                langchain_messages.append(SystemMessage(content=message.content))
+            message_class = _MESSAGE_CLASSES.get(message.role)
+            if message_class is not None:
+                langchain_messages.append(message_class(content=message.content))
         
         return langchain_messages
     
+    def _response_cache_key(
+        self,
+        messages: List[Any],
+        temperature: float,
+        max_tokens: int
+    ) -> bytes:
+        """Build the response cache key for a converted prompt."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{settings.llm_model}|{temperature}|{max_tokens}".encode())
+        for message in messages:
+            digest.update(f"\x1e{message.type}\x1f{message.content}".encode())
+        return digest.digest()
+    
     async def _stream_response(
         self, 
+        llm: ChatOpenAI,
         messages: List[Any], 
         callback_handler: StreamingCallbackHandler
     ) -> AsyncGenerator[str, None]:
         """Internal method to handle streaming response."""
         try:
-            async for chunk in self.llm.astream(messages, callbacks=[callback_handler]):
-                if chunk.content:
-                    yield chunk.content
+            async with aclosing(llm.astream(messages, callbacks=[callback_handler])) as stream:
+                async for chunk in stream:
+                    if chunk.content:
+                        yield chunk.content
         except Exception as e:
             logger.error("Internal streaming failed", error=str(e))
-            raise
\ No newline at end of file
+            raise
+
+
+@functools.lru_cache(maxsize=1)
+def get_shared_llm_service() -> LLMService:
+    """
+    Get the process-wide LLM service.
+    
+    The service holds no per-request state, so one instance (and its
+    embeddings client) is created on first use and shared by all requests.
+    """
+    return LLMService()
@@ -1,11 +1,10 @@
 """Vector store service for managing document embeddings and similarity search."""
 
-import json
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text
-from pgvector.sqlalchemy import Vector
+from sqlalchemy import select, func
 
+from app.models.conversation import Conversation
 from app.models.document import Document
 from app.models.message import Message
 from app.schemas.document import DocumentSearchResult
@@ -68,7 +67,7 @@ class VectorService:
             embedding: Embedding vector
         """
         try:
-            # Update message with embedding (stored as JSON)
+            # Update message with embedding
             result = await self.db.execute(
                 select(Message).where(Message.id == message_id)
             )
@@ -77,8 +76,7 @@ class VectorService:
             if not message:
                 raise VectorStoreError(f"Message {message_id} not found")
             
-            # Store embedding as JSON string
-            message.embedding = json.dumps(embedding)
+            message.embedding = embedding
             await self.db.commit()
             
             logger.info("Message embedding stored", message_id=message_id)
@@ -111,13 +109,14 @@ class VectorService:
         """
         try:
             # Build base query
+            distance = Document.embedding.cosine_distance(query_embedding)
             query = select(
                 Document,
-                (1 - Document.embedding.cosine_distance(query_embedding)).label("similarity")
+                (1 - distance).label("similarity")
             ).where(
                 Document.is_active == True,
                 Document.embedding.is_not(None),
-                (1 - Document.embedding.cosine_distance(query_embedding)) >= similarity_threshold
+                distance <= 1 - similarity_threshold
             )
             
             # Add user filter if specified
@@ -128,10 +127,8 @@ class VectorService:
             else:
                 query = query.where(Document.is_public == True)
             
-            # Order by similarity and limit results
-            query = query.order_by(
-                (1 - Document.embedding.cosine_distance(query_embedding)).desc()
-            ).limit(limit)
+            # Order by distance, which the HNSW index can serve, and limit results
+            query = query.order_by(distance).limit(limit)
             
             result = await self.db.execute(query)
             rows = result.all()
@@ -187,60 +184,38 @@ class VectorService:
             List of message search results
         """
         try:
-            # For message search, we need to use raw SQL due to JSON embedding storage
-            similarity_sql = """
-                SELECT m.*, c.user_id,
-                       1 - (m.embedding::vector <=> %s::vector) as similarity
-                FROM messages m
-                JOIN conversations c ON m.conversation_id = c.id
-                WHERE m.embedding IS NOT NULL
-                  AND m.is_deleted = false
-                  AND 1 - (m.embedding::vector <=> %s::vector) >= %s
-            """
-            
-            params = [query_embedding, query_embedding, similarity_threshold]
+            distance = Message.embedding.cosine_distance(query_embedding)
+            query = select(
+                Message,
+                (1 - distance).label("similarity")
+            ).join(
+                Conversation, Message.conversation_id == Conversation.id
+            ).where(
+                Message.is_deleted == False,
+                Message.embedding.is_not(None),
+                distance <= 1 - similarity_threshold
+            )
             
             # Add filters
             if user_id:
-                similarity_sql += " AND c.user_id = %s"
-                params.append(user_id)
+                query = query.where(Conversation.user_id == user_id)
             
             if conversation_id:
-                similarity_sql += " AND m.conversation_id = %s"
-                params.append(conversation_id)
+                query = query.where(Message.conversation_id == conversation_id)
             
-            similarity_sql += " ORDER BY similarity DESC LIMIT %s"
-            params.append(limit)
+            query = query.order_by(distance).limit(limit)
             
-            result = await self.db.execute(text(similarity_sql), params)
-            rows = result.fetchall()
+            result = await self.db.execute(query)
+            rows = result.all()
             
-            search_results = []
-            for row in rows:
-                # Create message object
-                message = Message(
-                    id=row.id,
-                    conversation_id=row.conversation_id,
-                    content=row.content,
-                    role=row.role,
-                    message_type=row.message_type,
-                    metadata=row.metadata,
-                    is_edited=row.is_edited,
-                    is_deleted=row.is_deleted,
-                    token_count=row.token_count,
-                    processing_time=row.processing_time,
-                    model_used=row.model_used,
-                    created_at=row.created_at,
-                    updated_at=row.updated_at
-                )
-                
-                search_results.append(
-                    MessageSearchResult(
-                        message=message,
-                        similarity_score=float(row.similarity),
-                        highlights=[]  # TODO: Implement highlighting
-                    )
+            search_results = [
+                MessageSearchResult(
+                    message=message,
+                    similarity_score=float(similarity),
+                    highlights=[]  # TODO: Implement highlighting
                 )
+                for message, similarity in rows
+            ]
             
             logger.info(
                 "Message search completed",
@@ -280,7 +255,7 @@ class VectorService:
             )
             row = result.first()
             
-            if not row or not row.embedding:
+            if not row or row.embedding is None:
                 raise VectorStoreError(f"Document {document_id} not found or has no embedding")
             
             reference_embedding = row.embedding
@@ -288,14 +263,15 @@ class VectorService:
             is_public = row.is_public
             
             # Search for similar documents
+            distance = Document.embedding.cosine_distance(reference_embedding)
             query = select(
                 Document,
-                (1 - Document.embedding.cosine_distance(reference_embedding)).label("similarity")
+                (1 - distance).label("similarity")
             ).where(
                 Document.id != document_id,  # Exclude the reference document
                 Document.is_active == True,
                 Document.embedding.is_not(None),
-                (1 - Document.embedding.cosine_distance(reference_embedding)) >= similarity_threshold
+                distance <= 1 - similarity_threshold
             )
             
             # Apply visibility filters
@@ -306,9 +282,7 @@ class VectorService:
             else:
                 query = query.where(Document.is_public == True)
             
-            query = query.order_by(
-                (1 - Document.embedding.cosine_distance(reference_embedding)).desc()
-            ).limit(limit)
+            query = query.order_by(distance).limit(limit)
             
             result = await self.db.execute(query)
             rows = result.all()
@@ -1,13 +1,19 @@
 """Utilities package."""
 
+from app.utils.cache import TTLCache
 from app.utils.document_processor import DocumentProcessor
+from app.utils.rate_limiter import AsyncRateLimiter
 from app.utils.helpers import (
     format_file_size, validate_email, sanitize_filename, 
-    generate_unique_filename, parse_tags
+    generate_unique_filename, parse_tags, create_background_task,
+    estimate_token_count
 )
 
 __all__ = [
+    "TTLCache",
     "DocumentProcessor",
+    "AsyncRateLimiter",
     "format_file_size", "validate_email", "sanitize_filename",
-    "generate_unique_filename", "parse_tags"
+    "generate_unique_filename", "parse_tags", "create_background_task",
+    "estimate_token_count"
 ]
\ No newline at end of file
@@ -1,26 +1,89 @@
 """Document processor for extracting text from various file formats."""
 
+import asyncio
 import io
+import mmap
+import multiprocessing
+import os
 import re
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Optional, Union
 import PyPDF2
 from docx import Document as DocxDocument
 
+from app.config import settings
 from app.core.exceptions import ValidationError
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Content types whose parsers are CPU-bound pure Python
+_BINARY_CONTENT_TYPES = frozenset({
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword"
+})
+
+# Encodings tried in turn when decoding plain text
+_TEXT_ENCODINGS = ("utf-8", "utf-16", "latin1", "cp1252")
+
+# Text cleanup patterns, compiled once at import
+_WHITESPACE_RE = re.compile(r'\s+')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]')
+_LINE_BREAK_RE = re.compile(r'\r\n|\r')
+_EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
+
+# Worker processes for PDF/DOCX parsing, created at application startup
+# (or on first use outside the server)
+_extract_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared extraction process pool, creating it if needed.
+    
+    Workers are started through a forkserver: forking the threaded server
+    process directly can deadlock a child on a lock another thread held.
+    """
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ProcessPoolExecutor(
+            max_workers=settings.extract_workers,
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _extract_pool
+
+
+def start_extract_pool() -> None:
+    """Create the extraction process pool."""
+    _get_extract_pool()
+
+
+def shutdown_extract_pool() -> None:
+    """Shut down the extraction process pool."""
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(wait=False, cancel_futures=True)
+        _extract_pool = None
+
+
+def _extract_in_process(file_content: bytes, content_type: str) -> str:
+    """Entry point for extraction inside a pool worker process."""
+    return DocumentProcessor()._extract_text(file_content, content_type)
+
 
 class DocumentProcessor:
     """Utility class for processing and extracting text from documents."""
     
-    async def extract_text(self, file_content: bytes, content_type: str) -> str:
+    async def extract_text(self, file_content: Union[bytes, BinaryIO], content_type: str) -> str:
         """
         Extract text from file content based on content type.
         
+        PDF and DOCX parsing is CPU-bound and holds the GIL, so those files
+        are parsed in a worker process; plain text is decoded in a thread.
+        
         Args:
-            file_content: File content as bytes
+            file_content: File content as bytes or a binary file object
             content_type: MIME content type
             
         Returns:
@@ -29,28 +92,47 @@ class DocumentProcessor:
         Raises:
             ValidationError: If file processing fails
         """
+        if not self._is_binary_type(content_type):
+            return await asyncio.to_thread(self._extract_text, file_content, content_type)
+        
+        if not isinstance(file_content, bytes):
+            file_content = await asyncio.to_thread(file_content.read)
+        
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_extract_pool(),
+            _extract_in_process,
+            file_content,
+            content_type
+        )
+    
+    def _is_binary_type(self, content_type: str) -> bool:
+        """Check whether a content type is parsed in the process pool."""
+        return content_type in _BINARY_CONTENT_TYPES or content_type.endswith("/pdf")
+    
+    def _extract_text(self, file_content: Union[bytes, BinaryIO], content_type: str) -> str:
+        """Synchronous body of extract_text."""
         try:
             if content_type == "application/pdf" or content_type.endswith("/pdf"):
-                return await self._extract_pdf_text(file_content)
+                return self._extract_pdf_text(file_content)
             elif content_type in [
                 "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                 "application/msword"
             ]:
-                return await self._extract_docx_text(file_content)
+                return self._extract_docx_text(file_content)
             elif content_type.startswith("text/"):
-                return await self._extract_plain_text(file_content)
+                return self._extract_plain_text(file_content)
             else:
                 # Try to extract as plain text for unknown types
-                return await self._extract_plain_text(file_content)
+                return self._extract_plain_text(file_content)
                 
         except Exception as e:
             logger.error("Document processing failed", content_type=content_type, error=str(e))
             raise ValidationError(f"Failed to process document: {str(e)}")
     
-    async def _extract_pdf_text(self, file_content: bytes) -> str:
+    def _extract_pdf_text(self, file_content: Union[bytes, BinaryIO]) -> str:
         """Extract text from PDF file."""
         try:
-            pdf_file = io.BytesIO(file_content)
+            pdf_file = self._as_stream(file_content)
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             
             text_content = []
@@ -65,10 +147,10 @@ class DocumentProcessor:
         except Exception as e:
             raise ValidationError(f"Failed to extract PDF text: {str(e)}")
     
-    async def _extract_docx_text(self, file_content: bytes) -> str:
+    def _extract_docx_text(self, file_content: Union[bytes, BinaryIO]) -> str:
         """Extract text from DOCX file."""
         try:
-            docx_file = io.BytesIO(file_content)
+            docx_file = self._as_stream(file_content)
             document = DocxDocument(docx_file)
             
             text_content = []
@@ -92,42 +174,69 @@ class DocumentProcessor:
         except Exception as e:
             raise ValidationError(f"Failed to extract DOCX text: {str(e)}")
     
-    async def _extract_plain_text(self, file_content: bytes) -> str:
-        """Extract text from plain text file."""
+    def _extract_plain_text(self, file_content: Union[bytes, BinaryIO]) -> str:
+        """
+        Extract text from plain text file.
+        
+        Uploads that were spooled to disk are decoded straight from a memory
+        map of the file, skipping the intermediate bytes copy of the content.
+        """
         try:
-            # Try different encodings
-            encodings = ["utf-8", "utf-16", "latin1", "cp1252"]
+            if isinstance(file_content, bytes):
+                return self._decode_text(file_content)
             
-            for encoding in encodings:
-                try:
-                    text = file_content.decode(encoding)
-                    return self._clean_text(text)
-                except UnicodeDecodeError:
-                    continue
+            # Starlette's check: in-memory spooled files have not "rolled" to
+            # disk, and calling fileno() on them would force that rollover
+            if not getattr(file_content, "_rolled", True):
+                return self._decode_text(file_content.read())
+            try:
+                fileno = file_content.fileno()
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                return self._decode_text(file_content.read())
             
-            # If all encodings fail, use utf-8 with error handling
-            text = file_content.decode("utf-8", errors="replace")
-            return self._clean_text(text)
+            if os.fstat(fileno).st_size == 0:
+                return ""
+            with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+                return self._decode_text(mapped)
             
         except Exception as e:
             raise ValidationError(f"Failed to extract text: {str(e)}")
     
+    def _decode_text(self, data: Union[bytes, mmap.mmap]) -> str:
+        """Decode text content, trying common encodings in turn."""
+        for encoding in _TEXT_ENCODINGS:
+            try:
+                text = str(data, encoding)
+                return self._clean_text(text)
+            except UnicodeDecodeError:
+                continue
+        
+        # If all encodings fail, use utf-8 with error handling
+        text = str(data, "utf-8", errors="replace")
+        return self._clean_text(text)
+    
+    def _as_stream(self, file_content: Union[bytes, BinaryIO]) -> BinaryIO:
+        """Wrap bytes in a stream; file objects are used as-is."""
+        if isinstance(file_content, bytes):
+            return io.BytesIO(file_content)
+        return file_content
+    
     def _clean_text(self, text: str) -> str:
         """Clean and normalize extracted text."""
         if not text:
             return ""
         
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # Remove control characters except newlines and tabs
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', text)
+        text = _CONTROL_CHARS_RE.sub('', text)
         
         # Normalize line breaks
-        text = re.sub(r'\r\n|\r', '\n', text)
+        text = _LINE_BREAK_RE.sub('\n', text)
         
         # Remove excessive newlines
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _EXCESS_NEWLINES_RE.sub('\n\n', text)
         
         # Strip leading/trailing whitespace
         text = text.strip()
@@ -1,10 +1,14 @@
 """Helper utility functions."""
 
+import asyncio
 import re
 import uuid
-from typing import List, Optional
+from typing import Any, Coroutine, List, Optional, Set
 from pathlib import Path
 
+# Strong references to running background tasks
+_background_tasks: Set[asyncio.Task] = set()
+
 
 def format_file_size(size_bytes: int) -> str:
     """
@@ -145,6 +149,22 @@ def truncate_text(text: str, max_length: int, suffix: str = "...") -> str:
     return text[:max_length - len(suffix)] + suffix
 
 
+def estimate_token_count(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in text.
+    
+    Uses the common approximation of four characters per token for English
+    text, which is close enough for budgeting prompt context.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + 3) // 4
+
+
 def extract_mentions(text: str) -> List[str]:
     """
     Extract @mentions from text.
@@ -276,34 +296,60 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[st
     Returns:
         List of text chunks
     """
-    if len(text) <= chunk_size:
+    text_length = len(text)
+    if text_length <= chunk_size:
         return [text]
     
     chunks = []
     start = 0
     
-    while start < len(text):
+    # Sentence breaks are only taken in the last 30% of a chunk
+    min_break = int(chunk_size * 0.7)
+    
+    while start < text_length:
         end = start + chunk_size
         
         # Try to break at sentence boundary
-        if end < len(text):
+        if end < text_length:
             # Look for sentence endings near the chunk boundary
             sentence_end = max(
-                text.rfind('.', start, end),
-                text.rfind('!', start, end),
-                text.rfind('?', start, end)
+                text.rfind('.', start + min_break, end),
+                text.rfind('!', start + min_break, end),
+                text.rfind('?', start + min_break, end)
             )
             
-            if sentence_end > start + chunk_size * 0.7:  # Good break point found
+            if sentence_end > start + min_break:  # Good break point found
                 end = sentence_end + 1
+        else:
+            end = text_length
         
         chunk = text[start:end].strip()
         if chunk:
             chunks.append(chunk)
         
-        # Move start position with overlap
-        start = end - overlap
-        if start >= len(text):
+        if end >= text_length:
             break
+        
+        # Move start position with overlap, always making progress
+        start = max(end - overlap, start + 1)
+    
+    return chunks
+
+
+def create_background_task(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """
+    Schedule a coroutine as a fire-and-forget background task.
     
-    return chunks
\ No newline at end of file
+    The event loop only keeps weak references to tasks, so a reference is
+    held here until the task finishes.
+    
+    Args:
+        coro: Coroutine to run
+        
+    Returns:
+        The scheduled task
+    """
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Asynchronous rate limiting utilities."""
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Token bucket that spreads operations evenly over a time period."""
+
+    def __init__(self, rate: float, period: float = 60.0) -> None:
+        self.rate = rate
+        self.period = period
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """
+        Wait until capacity is available, then consume it.
+
+        Waiters are served in arrival order. Requests larger than the whole
+        bucket are capped at its capacity so they can still proceed.
+
+        Args:
+            amount: Capacity to consume
+        """
+        amount = min(amount, self.rate)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate,
+                    self._tokens + (now - self._updated) * self.rate / self.period
+                )
+                self._updated = now
+
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+
+                await asyncio.sleep((amount - self._tokens) * self.period / self.rate)
@@ -3,23 +3,88 @@
 import asyncio
 import os
 import sys
-from typing import Optional
+import time
+from typing import Any, AsyncIterator, Coroutine, Dict, Optional, Sequence, Tuple
 import click
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
+from rich.style import Style
 from rich.table import Table
-from rich.live import Live
-from rich.spinner import Spinner
+from rich.text import Text
 import httpx
+import orjson
 from dotenv import load_dotenv
 
+try:
+    # Installed with uvicorn[standard]; unavailable on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
 console = Console()
 
+# Seconds a cached conversation list is served before a background refresh
+CONVERSATION_CACHE_TTL = 10.0
+
+# Streamed replies are re-rendered at most this often (seconds) unless
+# STREAM_RENDER_CHARS new characters have arrived since the last render
+STREAM_RENDER_INTERVAL = 0.1
+STREAM_RENDER_CHARS = 256
+
+# Server-sent event framing
+_DATA_PREFIX = b"data: "
+_DATA_PREFIX_LEN = len(_DATA_PREFIX)
+_DONE_MARKER = b"[DONE]"
+
+# JSON bodies are pre-encoded with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Streams are requested uncompressed and may go quiet for a long time
+# between tokens (e.g. while the server waits for an LLM slot)
+_STREAM_HEADERS = {**_JSON_HEADERS, "Accept-Encoding": "identity"}
+_STREAM_TIMEOUT = httpx.Timeout(connect=5.0, read=None, write=30.0, pool=5.0)
+
+# Column templates with styles parsed once at import
+RECENT_CONVERSATION_COLUMNS = (
+    ("ID", Style.parse("cyan")),
+    ("Title", Style.parse("magenta")),
+    ("Messages", Style.parse("green")),
+    ("Last Activity", Style.parse("yellow")),
+)
+CONVERSATION_COLUMNS = (
+    ("ID", Style.parse("cyan")),
+    ("Title", Style.parse("magenta")),
+    ("Messages", Style.parse("green")),
+    ("Tokens", Style.parse("blue")),
+    ("Created", Style.parse("yellow")),
+)
+
+
+def _run(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion, on uvloop when it is available."""
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(coro)
+
+
+def _short_title(title: str, width: int = 50) -> str:
+    """Truncate a conversation title for table display."""
+    return title if len(title) <= width else title[:width] + "..."
+
+
+def _build_table(title: str, columns: Sequence[Tuple[str, Style]]) -> Table:
+    """Create an empty table from a column template."""
+    table = Table(title=title)
+    for header, style in columns:
+        table.add_column(header, style=style)
+    return table
+
 
 class ChatClient:
     """HTTP client for Chat API."""
@@ -27,7 +92,17 @@ class ChatClient:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url.rstrip("/")
         self.token: Optional[str] = None
-        self.client = httpx.AsyncClient()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0
+            )
+        )
+        # Conversation lists keyed by limit: (fetched_at, conversations)
+        self._conv_cache: Dict[Optional[int], Tuple[float, list]] = {}
+        self._conv_refresh: Dict[Optional[int], asyncio.Task] = {}
     
     async def login(self, username: str, password: str) -> bool:
         """Login and get access token."""
@@ -36,49 +111,49 @@ class ChatClient:
                 f"{self.base_url}/api/v1/auth/login",
                 data={"username": username, "password": password}
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.token = data["access_token"]
-                return True
-            else:
-                console.print(f"[red]Login failed: {response.text}[/red]")
-                return False
-                
-        except Exception as e:
+        except httpx.HTTPError as e:
             console.print(f"[red]Login error: {str(e)}[/red]")
             return False
+        
+        if response.status_code != 200:
+            console.print(f"[red]Login failed: {response.text}[/red]")
+            return False
+        
+        data = orjson.loads(response.content)
+        self.token = data["access_token"]
+        # Sent with every later request without a per-call header merge
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+        return True
     
     async def register(self, username: str, email: str, password: str, full_name: str = "") -> bool:
         """Register a new user."""
         try:
             response = await self.client.post(
                 f"{self.base_url}/api/v1/auth/register",
-                json={
+                content=orjson.dumps({
                     "username": username,
                     "email": email,
                     "password": password,
                     "full_name": full_name
-                }
+                }),
+                headers=_JSON_HEADERS
             )
-            
-            if response.status_code == 201:
-                console.print("[green]Registration successful![/green]")
-                return True
-            else:
-                console.print(f"[red]Registration failed: {response.text}[/red]")
-                return False
-                
-        except Exception as e:
+        except httpx.HTTPError as e:
             console.print(f"[red]Registration error: {str(e)}[/red]")
             return False
+        
+        if response.status_code != 201:
+            console.print(f"[red]Registration failed: {response.text}[/red]")
+            return False
+        
+        console.print("[green]Registration successful![/green]")
+        return True
     
     async def send_message(self, message: str, conversation_id: Optional[int] = None) -> dict:
         """Send a message and get response."""
         if not self.token:
             raise ValueError("Not authenticated")
         
-        headers = {"Authorization": f"Bearer {self.token}"}
         payload = {"message": message}
         
         if conversation_id:
@@ -86,33 +161,131 @@ class ChatClient:
         
         response = await self.client.post(
             f"{self.base_url}/api/v1/chat/message",
-            json=payload,
-            headers=headers
+            content=orjson.dumps(payload),
+            headers=_JSON_HEADERS
         )
         
         if response.status_code == 200:
-            return response.json()
+            self._expire_conversations()
+            return orjson.loads(response.content)
         else:
             raise Exception(f"Message failed: {response.text}")
     
-    async def get_conversations(self) -> list:
-        """Get user conversations."""
+    async def stream_message(
+        self,
+        message: str,
+        conversation_id: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Send a message and stream the response.
+        
+        Server-sent events are framed on the raw bytes, so each event's
+        JSON goes straight to orjson without decoding lines to str first.
+        """
+        if not self.token:
+            raise ValueError("Not authenticated")
+        
+        payload = {"message": message}
+        
+        if conversation_id:
+            payload["conversation_id"] = conversation_id
+        
+        async with self.client.stream(
+            "POST",
+            f"{self.base_url}/api/v1/chat/stream",
+            content=orjson.dumps(payload),
+            headers=_STREAM_HEADERS,
+            timeout=_STREAM_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise Exception(f"Message failed: {response.text}")
+            
+            buffer = bytearray()
+            async for data in response.aiter_bytes():
+                buffer += data
+                # Events end with a blank line. Complete events are parsed in
+                # place through a memoryview; only the consumed prefix is
+                # dropped, keeping any partial event buffered. Comment lines
+                # (": ping" keepalives) and empty data fields are skipped.
+                start = 0
+                with memoryview(buffer) as view:
+                    while (end := buffer.find(b"\n\n", start)) != -1:
+                        line_start = start
+                        while line_start < end:
+                            line_end = buffer.find(b"\n", line_start, end)
+                            if line_end == -1:
+                                line_end = end
+                            if buffer.startswith(_DATA_PREFIX, line_start, line_end):
+                                with view[line_start + _DATA_PREFIX_LEN:line_end] as data_field:
+                                    if data_field == _DONE_MARKER:
+                                        self._expire_conversations()
+                                        return
+                                    chunk = orjson.loads(data_field) if data_field else None
+                                if chunk is not None:
+                                    yield chunk
+                            line_start = line_end + 1
+                        start = end + 2
+                del buffer[:start]
+    
+    async def get_conversations(self, limit: Optional[int] = None) -> list:
+        """
+        Get user conversations.
+        
+        Cached lists are returned immediately; once older than
+        CONVERSATION_CACHE_TTL a refresh is scheduled in the background
+        and the stale list is served until it completes.
+        """
         if not self.token:
             raise ValueError("Not authenticated")
         
-        headers = {"Authorization": f"Bearer {self.token}"}
+        cached = self._conv_cache.get(limit)
+        if cached is None:
+            return await self._fetch_conversations(limit)
+        
+        fetched_at, conversations = cached
+        if (
+            time.monotonic() - fetched_at >= CONVERSATION_CACHE_TTL
+            and limit not in self._conv_refresh
+        ):
+            self._conv_refresh[limit] = asyncio.create_task(
+                self._refresh_conversations(limit)
+            )
+        return conversations
+    
+    async def _refresh_conversations(self, limit: Optional[int]) -> None:
+        """Refresh a cached conversation list, keeping the old one on failure."""
+        try:
+            await self._fetch_conversations(limit)
+        except Exception:
+            pass
+        finally:
+            self._conv_refresh.pop(limit, None)
+    
+    async def _fetch_conversations(self, limit: Optional[int]) -> list:
+        """Fetch conversations from the API and cache the result."""
+        params = {"limit": limit} if limit else None
         response = await self.client.get(
             f"{self.base_url}/api/v1/conversations/",
-            headers=headers
+            params=params
         )
         
         if response.status_code == 200:
-            return response.json()
+            conversations = orjson.loads(response.content)
+            self._conv_cache[limit] = (time.monotonic(), conversations)
+            return conversations
         else:
             raise Exception(f"Failed to get conversations: {response.text}")
     
+    def _expire_conversations(self) -> None:
+        """Mark cached conversation lists stale so the next read refreshes them."""
+        for limit, (_, conversations) in list(self._conv_cache.items()):
+            self._conv_cache[limit] = (0.0, conversations)
+    
     async def close(self):
         """Close the HTTP client."""
+        for task in self._conv_refresh.values():
+            task.cancel()
         await self.client.aclose()
 
 
@@ -128,12 +301,24 @@ def cli():
 @click.option("--password", help="Password for login")
 def chat(url: str, username: Optional[str], password: Optional[str]):
     """Start interactive chat session."""
-    asyncio.run(_chat_session(url, username, password))
+    _run(_chat_session(url, username, password))
 
 
-async def _chat_session(url: str, username: Optional[str], password: Optional[str]):
-    """Main chat session."""
-    client = ChatClient(url)
+async def _chat_session(
+    url: str,
+    username: Optional[str],
+    password: Optional[str],
+    client: Optional[ChatClient] = None
+):
+    """
+    Main chat session.
+    
+    An existing client (and its open connections) can be passed in; it is
+    then left for the caller to close.
+    """
+    owns_client = client is None
+    if owns_client:
+        client = ChatClient(url)
     
     try:
         # Show welcome
@@ -157,18 +342,14 @@ async def _chat_session(url: str, username: Optional[str], password: Optional[st
         
         # Show conversations
         try:
-            conversations = await client.get_conversations()
+            conversations = await client.get_conversations(limit=5)
             if conversations:
-                table = Table(title="Recent Conversations")
-                table.add_column("ID", style="cyan")
-                table.add_column("Title", style="magenta")
-                table.add_column("Messages", style="green")
-                table.add_column("Last Activity", style="yellow")
+                table = _build_table("Recent Conversations", RECENT_CONVERSATION_COLUMNS)
                 
-                for conv in conversations[:5]:  # Show last 5
+                for conv in conversations:
                     table.add_row(
                         str(conv["id"]),
-                        conv["title"][:50] + "..." if len(conv["title"]) > 50 else conv["title"],
+                        _short_title(conv["title"]),
                         str(conv["message_count"]),
                         conv.get("last_message_at", "N/A")
                     )
@@ -204,25 +385,56 @@ async def _chat_session(url: str, username: Optional[str], password: Optional[st
                     await _show_conversations(client)
                     continue
                 
-                # Send message
-                with Live(Spinner("dots", text="[bold green]Thinking..."), console=console):
-                    response = await client.send_message(user_input, conversation_id)
+                # Send message and print the response as it streams in
+                console.print("\n[bold green]Assistant[/bold green]:")
+                start_time = time.monotonic()
+                final_chunk: dict = {}
+                response_parts = []
+                response_len = rendered_len = 0
+                last_render = start_time
+                
+                # Plain text is re-rendered in batches while streaming; the
+                # Markdown is parsed once when the reply is complete
+                with Live(
+                    Text(),
+                    console=console,
+                    refresh_per_second=5,
+                    vertical_overflow="visible"
+                ) as live:
+                    async for chunk in client.stream_message(user_input, conversation_id):
+                        if chunk.get("finished"):
+                            final_chunk = chunk
+                            continue
+                        
+                        response_parts.append(chunk["delta"])
+                        response_len += len(chunk["delta"])
+                        
+                        now = time.monotonic()
+                        if (
+                            now - last_render >= STREAM_RENDER_INTERVAL
+                            or response_len - rendered_len >= STREAM_RENDER_CHARS
+                        ):
+                            live.update(Text("".join(response_parts)))
+                            last_render = now
+                            rendered_len = response_len
+                    
+                    live.update(Markdown("".join(response_parts)))
+                
+                metadata = final_chunk.get("metadata") or {}
+                if metadata.get("error"):
+                    raise Exception(metadata["error"])
                 
                 # Update conversation ID
-                conversation_id = response["conversation_id"]
+                conversation_id = final_chunk.get("conversation_id", conversation_id)
                 
-                # Display response
-                console.print("\n[bold green]Assistant[/bold green]:")
-                console.print(Panel(
-                    Markdown(response["message"]),
-                    title=f"Response (Tokens: {response['token_count']}, "
-                          f"Time: {response['processing_time']:.2f}s)",
-                    border_style="green"
-                ))
+                console.print(
+                    f"[dim](Tokens: {metadata.get('token_count', 0)}, "
+                    f"Time: {time.monotonic() - start_time:.2f}s)[/dim]"
+                )
                 
                 # Show sources if available
-                if response.get("sources"):
-                    _show_sources(response["sources"])
+                if metadata.get("sources"):
+                    _show_sources(metadata["sources"])
                 
             except KeyboardInterrupt:
                 console.print("\n[yellow]Use 'quit' to exit[/yellow]")
@@ -232,7 +444,8 @@ async def _chat_session(url: str, username: Optional[str], password: Optional[st
                 continue
     
     finally:
-        await client.close()
+        if owns_client:
+            await client.close()
         console.print("\n[blue]Goodbye![/blue]")
 
 
@@ -264,17 +477,12 @@ async def _show_conversations(client: ChatClient):
             console.print("[yellow]No conversations found[/yellow]")
             return
         
-        table = Table(title="Your Conversations")
-        table.add_column("ID", style="cyan")
-        table.add_column("Title", style="magenta")
-        table.add_column("Messages", style="green")
-        table.add_column("Tokens", style="blue")
-        table.add_column("Created", style="yellow")
+        table = _build_table("Your Conversations", CONVERSATION_COLUMNS)
         
         for conv in conversations:
             table.add_row(
                 str(conv["id"]),
-                conv["title"][:50] + "..." if len(conv["title"]) > 50 else conv["title"],
+                _short_title(conv["title"]),
                 str(conv["message_count"]),
                 str(conv["total_tokens"]),
                 conv["created_at"][:10]  # Just the date
@@ -300,7 +508,7 @@ def _show_sources(sources: list):
 @click.option("--url", default="http://localhost:8000", help="API base URL")
 def register(url: str):
     """Register a new user."""
-    asyncio.run(_register_user(url))
+    _run(_register_user(url))
 
 
 async def _register_user(url: str):
@@ -330,7 +538,7 @@ async def _register_user(url: str):
             console.print("\n[green]✓ Account created successfully![/green]")
             
             if Confirm.ask("Would you like to start chatting now?"):
-                await _chat_session(url, username, password)
+                await _chat_session(url, username, password, client=client)
     
     finally:
         await client.close()
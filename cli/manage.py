@@ -1,10 +1,15 @@
 """Management CLI for database operations and system administration."""
 
 import asyncio
+import json
 import sys
+import time
 from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
 import click
 from rich.console import Console
+from rich.style import Style
 from rich.table import Table
 from rich.panel import Panel
 from dotenv import load_dotenv
@@ -12,7 +17,8 @@ from dotenv import load_dotenv
 # Add app to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.database import init_db, close_db, engine
+# Database and service modules are imported inside the commands that use
+# them, so commands such as show-config and runserver start quickly
 from app.config import settings
 from app.core.logging import setup_logging, get_logger
 
@@ -24,6 +30,28 @@ console = Console()
 setup_logging()
 logger = get_logger(__name__)
 
+# show-stats results are cached here for settings.stats_cache_ttl seconds
+STATS_CACHE_FILE = Path.home() / ".cache" / "chat" / "stats.json"
+
+# Column styles for the statistics table, parsed once at import
+STATS_COLUMNS = (
+    ("Metric", Style.parse("cyan")),
+    ("Count", Style.parse("green")),
+)
+
+
+def _use_unpooled_engine() -> None:
+    """
+    Switch the database engine to unpooled connections.
+    
+    One-shot commands open a connection or two and exit, so the API's
+    connection pool would only add checkout bookkeeping and pre-ping queries.
+    """
+    from sqlalchemy.pool import NullPool
+    from app.database import configure_engine
+    
+    configure_engine(poolclass=NullPool)
+
 
 @click.group()
 def cli():
@@ -39,11 +67,14 @@ def init_database():
 
 async def _init_database():
     """Initialize database."""
+    _use_unpooled_engine()
+    from app.database import init_db, close_db
+    
     try:
         console.print("[yellow]Initializing database...[/yellow]")
         
         with console.status("[bold green]Creating tables and extensions..."):
-            await init_db()
+            await init_db(force=True)
         
         console.print("[green]✓ Database initialized successfully![/green]")
         
@@ -63,9 +94,10 @@ def check_database():
 
 async def _check_database():
     """Check database status."""
+    _use_unpooled_engine()
+    from app.database import check_db_connection, close_db
+    
     try:
-        from app.database import check_db_connection
-        
         console.print("[yellow]Checking database connection...[/yellow]")
         
         healthy = await check_db_connection()
@@ -90,6 +122,7 @@ async def _show_database_stats():
     """Show database statistics."""
     try:
         from sqlalchemy import text
+        from app.database import engine
         
         async with engine.begin() as conn:
             # Check if tables exist
@@ -144,19 +177,19 @@ def create_superuser(username: str, email: str, password: str):
 
 async def _create_superuser(username: str, email: str, password: str):
     """Create superuser."""
+    _use_unpooled_engine()
     try:
-        from app.database import get_db
+        from app.database import db_session
         from app.services.auth_service import AuthService
         from app.schemas.user import UserCreate
         
         console.print(f"[yellow]Creating superuser '{username}'...[/yellow]")
         
-        async for db in get_db():
+        async with db_session() as db:
             auth_service = AuthService(db)
             
             # Check if user exists
-            existing_user = await auth_service.get_user_by_username(username)
-            if existing_user:
+            if await auth_service.user_exists(username):
                 console.print(f"[red]User '{username}' already exists![/red]")
                 return
             
@@ -169,14 +202,9 @@ async def _create_superuser(username: str, email: str, password: str):
                 is_active=True
             )
             
-            user = await auth_service.create_user(user_data)
-            
-            # Make superuser
-            user.is_superuser = True
-            await db.commit()
+            await auth_service.create_user(user_data, is_superuser=True)
             
             console.print(f"[green]✓ Superuser '{username}' created successfully![/green]")
-            break
     
     except Exception as e:
         console.print(f"[red]Superuser creation failed: {str(e)}[/red]")
@@ -196,7 +224,7 @@ def show_config():
         ("API Version", settings.api_version),
         ("Debug Mode", str(settings.debug)),
         ("Log Level", settings.log_level),
-        ("Database URL", str(settings.database_url).replace(settings.database_url.password or "", "***")),
+        ("Database URL", _mask_database_url(str(settings.database_url))),
         ("LLM Model", settings.llm_model),
         ("Vector Dimension", str(settings.vector_dimension)),
         ("Max File Size", f"{settings.max_file_size_mb} MB"),
@@ -209,6 +237,16 @@ def show_config():
     console.print(config_table)
 
 
+def _mask_database_url(url: str) -> str:
+    """Replace the password in a database URL with asterisks."""
+    parts = urlsplit(url)
+    userinfo, at, hostinfo = parts.netloc.rpartition("@")
+    username, colon, _ = userinfo.partition(":")
+    if not colon:
+        return url
+    return parts._replace(netloc=f"{username}:***{at}{hostinfo}").geturl()
+
+
 @cli.command()
 def cleanup_analytics():
     """Clean up old analytics data."""
@@ -217,18 +255,18 @@ def cleanup_analytics():
 
 async def _cleanup_analytics():
     """Clean up analytics."""
+    _use_unpooled_engine()
     try:
-        from app.database import get_db
+        from app.database import db_session
         from app.services.analytics_service import AnalyticsService
         
         console.print("[yellow]Cleaning up old analytics data...[/yellow]")
         
-        async for db in get_db():
+        async with db_session() as db:
             analytics_service = AnalyticsService(db)
             deleted_count = await analytics_service.cleanup_old_analytics(days_to_keep=90)
             
             console.print(f"[green]✓ Cleaned up {deleted_count} old analytics records[/green]")
-            break
     
     except Exception as e:
         console.print(f"[red]Analytics cleanup failed: {str(e)}[/red]")
@@ -236,77 +274,106 @@ async def _cleanup_analytics():
 
 
 @cli.command()
-def show_stats():
+@click.option("--refresh", is_flag=True, help="Ignore cached statistics")
+def show_stats(refresh: bool):
     """Show system statistics."""
-    asyncio.run(_show_stats())
+    asyncio.run(_show_stats(refresh))
 
 
-async def _show_stats():
+async def _show_stats(refresh: bool = False):
     """Show system statistics."""
     try:
-        from app.database import get_db
-        from app.services.vector_service import VectorService
-        from sqlalchemy import select, func
-        from app.models.user import User
-        from app.models.conversation import Conversation
-        from app.models.message import Message
-        from app.models.document import Document
+        counts = None if refresh else _load_cached_stats()
         
-        console.print("[yellow]Gathering system statistics...[/yellow]")
+        if counts is None:
+            console.print("[yellow]Gathering system statistics...[/yellow]")
+            counts = await _query_stats()
+            _save_cached_stats(counts)
+        else:
+            console.print("[dim]Showing cached statistics (use --refresh to update)[/dim]")
         
-        async for db in get_db():
-            # User stats
-            user_count_result = await db.execute(select(func.count(User.id)))
-            user_count = user_count_result.scalar()
-            
-            active_user_count_result = await db.execute(
-                select(func.count(User.id)).where(User.is_active == True)
-            )
-            active_user_count = active_user_count_result.scalar()
-            
-            # Conversation stats
-            conv_count_result = await db.execute(select(func.count(Conversation.id)))
-            conv_count = conv_count_result.scalar()
-            
-            # Message stats
-            msg_count_result = await db.execute(select(func.count(Message.id)))
-            msg_count = msg_count_result.scalar()
-            
-            # Document stats
-            doc_count_result = await db.execute(select(func.count(Document.id)))
-            doc_count = doc_count_result.scalar()
-            
-            # Vector stats
-            vector_service = VectorService(db)
-            vector_stats = await vector_service.get_vector_stats()
-            
-            # Create stats table
-            stats_table = Table(title="System Statistics")
-            stats_table.add_column("Metric", style="cyan")
-            stats_table.add_column("Count", style="green")
-            
-            stats = [
-                ("Total Users", str(user_count)),
-                ("Active Users", str(active_user_count)),
-                ("Total Conversations", str(conv_count)),
-                ("Total Messages", str(msg_count)),
-                ("Total Documents", str(doc_count)),
-                ("Documents with Embeddings", str(vector_stats.get("documents_with_embeddings", 0))),
-                ("Messages with Embeddings", str(vector_stats.get("messages_with_embeddings", 0))),
-                ("Vector Dimension", str(vector_stats.get("vector_dimension", 0))),
-            ]
-            
-            for metric, count in stats:
-                stats_table.add_row(metric, count)
-            
-            console.print(stats_table)
-            break
+        # Create stats table
+        stats_table = Table(title="System Statistics")
+        for header, style in STATS_COLUMNS:
+            stats_table.add_column(header, style=style)
+        
+        stats = [
+            ("Total Users", str(counts["users"])),
+            ("Active Users", str(counts["active_users"])),
+            ("Total Conversations", str(counts["conversations"])),
+            ("Total Messages", str(counts["messages"])),
+            ("Total Documents", str(counts["documents"])),
+            ("Documents with Embeddings", str(counts["documents_with_embeddings"])),
+            ("Messages with Embeddings", str(counts["messages_with_embeddings"])),
+            ("Vector Dimension", str(settings.vector_dimension)),
+        ]
+        
+        for metric, count in stats:
+            stats_table.add_row(metric, count)
+        
+        console.print(stats_table)
     
     except Exception as e:
         console.print(f"[red]Failed to gather statistics: {str(e)}[/red]")
         logger.error("Statistics gathering failed", error=str(e))
 
 
+async def _query_stats() -> Dict[str, int]:
+    """Count users, conversations, messages and documents."""
+    _use_unpooled_engine()
+    from app.database import db_session
+    from sqlalchemy import select, func
+    from app.models.user import User
+    from app.models.conversation import Conversation
+    from app.models.message import Message
+    from app.models.document import Document
+    
+    # All counts as scalar subqueries of one statement: a single round-trip
+    stats_query = select(
+        select(func.count()).select_from(User).scalar_subquery().label("users"),
+        select(func.count()).select_from(User)
+        .where(User.is_active == True)
+        .scalar_subquery().label("active_users"),
+        select(func.count()).select_from(Conversation).scalar_subquery().label("conversations"),
+        select(func.count()).select_from(Message).scalar_subquery().label("messages"),
+        select(func.count()).select_from(Message)
+        .where(Message.embedding.is_not(None))
+        .scalar_subquery().label("messages_with_embeddings"),
+        select(func.count()).select_from(Document).scalar_subquery().label("documents"),
+        select(func.count()).select_from(Document)
+        .where(Document.embedding.is_not(None))
+        .scalar_subquery().label("documents_with_embeddings"),
+    )
+    
+    async with db_session() as db:
+        result = await db.execute(stats_query)
+        return dict(result.one()._mapping)
+
+
+def _load_cached_stats() -> Optional[Dict[str, int]]:
+    """Load statistics cached by a recent run, if still fresh."""
+    if settings.stats_cache_ttl <= 0:
+        return None
+    try:
+        cached = json.loads(STATS_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return None
+    if time.time() - cached.get("timestamp", 0) >= settings.stats_cache_ttl:
+        return None
+    return cached.get("counts")
+
+
+def _save_cached_stats(counts: Dict[str, int]) -> None:
+    """Cache statistics for later runs; failures are ignored."""
+    if settings.stats_cache_ttl <= 0:
+        return
+    try:
+        STATS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        STATS_CACHE_FILE.write_text(json.dumps({"timestamp": time.time(), "counts": counts}))
+    except OSError:
+        pass
+
+
 @cli.command()
 @click.option("--host", default="0.0.0.0", help="Host to bind to")
 @click.option("--port", default=8000, help="Port to bind to")